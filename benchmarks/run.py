@@ -0,0 +1,162 @@
+# Project by @QuantDevJayson
+# GitHub: https://github.com/QuantDevJayson
+# PyPI: https://pypi.org/user/jayson.ashioya
+# LinkedIn: https://www.linkedin.com/in/jayson-ashioya-c-082814176/
+
+import argparse
+import gc
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from benchmarks.synthetic import factor_model_prices
+from modules.analytics import performance_metrics
+from modules import centrality, information, network, visualization
+from modules.network import build_network, correlation_matrix, hierarchical_clustering, mst_network
+from modules.panel import ReturnsPanel
+from modules.portfolio import hrp_weights
+
+# Times each hot path of the pipeline on synthetic universes and records peak traced memory.
+#
+#   python -m benchmarks.run --preset quick --out bench.json
+#   python -m benchmarks.run --preset quick --compare bench.json
+#
+# Timings are the best of --repeat runs; memory comes from one extra run under tracemalloc, so the
+# tracing overhead never shows up in the timings. Every stage gets a fresh ReturnsPanel and empty
+# module caches (linkages, centralities, mutual information, layouts), so cached panel properties,
+# trees and results never carry over between runs.
+
+PRESETS = {
+    "quick": [(10, 250), (100, 1000), (500, 1000)],
+    "full": [(n, t) for n in (10, 100, 1000, 5000) for t in (250, 1000, 5000)],
+}
+THRESHOLD = 0.5
+
+
+def _panel(prices):
+    for cache in (network._linkages, centrality._cache, information._cache, visualization._layouts,
+                  visualization._last_layout):
+        cache.clear()
+    return ReturnsPanel.from_prices(prices)
+
+
+def _pipeline(prices):
+    panel = _panel(prices)
+    corr = correlation_matrix(panel)
+    G = build_network(corr, threshold=THRESHOLD)
+    mst_network(corr)
+    weights, _ = hrp_weights(panel)
+    return performance_metrics(panel.portfolio_returns(weights), weights=weights.values, network=G)
+
+
+def stages(prices):
+    # name -> (setup, stage); only the stage is measured
+    def with_corr():
+        return (correlation_matrix(_panel(prices)),)
+
+    def with_weights():
+        panel = _panel(prices)
+        weights, _ = hrp_weights(panel)
+        return panel.portfolio_returns(weights), weights.values, build_network(correlation_matrix(panel), THRESHOLD)
+
+    return {
+        "correlation_matrix": (lambda: (_panel(prices),), correlation_matrix),
+        "build_network": (with_corr, lambda corr: build_network(corr, threshold=THRESHOLD)),
+        "mst_network": (with_corr, mst_network),
+        "hierarchical_clustering": (lambda: (_panel(prices),), hierarchical_clustering),
+        "hrp_weights": (lambda: (_panel(prices),), hrp_weights),
+        "performance_metrics": (with_weights, lambda r, w, G: performance_metrics(r, weights=w, network=G)),
+        "pipeline": (lambda: (prices,), _pipeline),
+    }
+
+
+def measure(setup, stage, repeat):
+    times = []
+    for _ in range(repeat):
+        args = setup()
+        gc.collect()
+        start = time.perf_counter()
+        stage(*args)
+        times.append(time.perf_counter() - start)
+    args = setup()
+    gc.collect()
+    tracemalloc.start()
+    stage(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(times), peak
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"commit": commit, "python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+            "machine": platform.machine(), "processor": platform.processor(), "timestamp": pd.Timestamp.now().isoformat()}
+
+
+def run(sizes, only=None, repeat=3, seed=0):
+    results = []
+    for n_assets, n_days in sizes:
+        prices = factor_model_prices(n_assets, n_days, seed=seed)
+        for name, (setup, stage) in stages(prices).items():
+            if only and name not in only:
+                continue
+            seconds, peak = measure(setup, stage, repeat)
+            results.append({"stage": name, "assets": n_assets, "days": n_days, "seconds": seconds, "peak_mb": peak / 2 ** 20})
+            print(f"{name:<24} {n_assets:>5} x {n_days:<5} {seconds:10.4f}s {peak / 2 ** 20:10.1f} MB", flush=True)
+    return results
+
+
+def compare(results, baseline, tolerance=0.25, min_seconds=0.01):
+    # Stages slower than baseline by more than `tolerance`; stages under min_seconds are too noisy to judge
+    reference = {(r["stage"], r["assets"], r["days"]): r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        old = reference.get((r["stage"], r["assets"], r["days"]))
+        if old is None or max(r["seconds"], old["seconds"]) < min_seconds:
+            continue
+        ratio = r["seconds"] / old["seconds"] if old["seconds"] > 0 else np.inf
+        flag = "REGRESSION" if ratio > 1 + tolerance else ("faster" if ratio < 1 - tolerance else "")
+        print(f"{r['stage']:<24} {r['assets']:>5} x {r['days']:<5} {old['seconds']:9.4f}s -> {r['seconds']:9.4f}s "
+              f"({ratio:5.2f}x) {flag}")
+        if flag == "REGRESSION":
+            regressions.append({**r, "baseline_seconds": old["seconds"], "ratio": ratio})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the network and portfolio pipeline on synthetic universes")
+    parser.add_argument("--preset", choices=list(PRESETS), default="quick")
+    parser.add_argument("--assets", nargs="+", type=int, help="Asset counts (overrides the preset, with --days)")
+    parser.add_argument("--days", nargs="+", type=int, default=[1000])
+    parser.add_argument("--stage", nargs="+", help="Only run these stages")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before a stage is flagged")
+    args = parser.parse_args(argv)
+
+    sizes = [(n, t) for n in args.assets for t in args.days] if args.assets else PRESETS[args.preset]
+    results = run(sizes, only=args.stage, repeat=args.repeat, seed=args.seed)
+    report = {"environment": environment(), "results": results}
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), tolerance=args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s) above {args.tolerance:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
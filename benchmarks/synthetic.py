@@ -0,0 +1,34 @@
+# Project by @QuantDevJayson
+# GitHub: https://github.com/QuantDevJayson
+# PyPI: https://pypi.org/user/jayson.ashioya
+# LinkedIn: https://www.linkedin.com/in/jayson-ashioya-c-082814176/
+
+import numpy as np
+import pandas as pd
+
+# Reproducible synthetic universes: daily log returns from a market factor, one factor per sector
+# and idiosyncratic noise, so correlations have the block structure of real equity universes.
+# Sectors hold about SECTOR_SIZE assets, which keeps thresholded networks sparse as N grows.
+
+SECTOR_SIZE = 50
+
+
+def factor_model_returns(n_assets, n_days, n_sectors=None, market_vol=0.008, sector_vol=0.01, idio_vol=0.01, seed=0):
+    rng = np.random.default_rng(seed)
+    n_sectors = n_sectors or max(1, n_assets // SECTOR_SIZE)
+    sector = rng.integers(0, n_sectors, n_assets)
+    market = rng.standard_normal((n_days, 1)) * market_vol
+    sectors = rng.standard_normal((n_days, n_sectors)) * sector_vol
+    beta = rng.uniform(0.5, 1.5, n_assets)
+    returns = market * beta + sectors[:, sector] + rng.standard_normal((n_days, n_assets)) * idio_vol
+    index = pd.bdate_range("2000-01-03", periods=n_days)
+    columns = [f"S{s:03d}_{i:05d}" for i, s in enumerate(sector)]
+    return pd.DataFrame(returns, index=index, columns=columns)
+
+
+def factor_model_prices(n_assets, n_days, seed=0, **options):
+    # Prices start at 100 and include the first day, so ReturnsPanel.from_prices gives n_days returns
+    returns = factor_model_returns(n_assets, n_days, seed=seed, **options)
+    levels = 100 * np.exp(np.vstack([np.zeros((1, n_assets)), np.cumsum(returns.to_numpy(), axis=0)]))
+    index = returns.index.insert(0, returns.index[0] - pd.offsets.BDay())
+    return pd.DataFrame(levels, index=index, columns=returns.columns)
@@ -13,15 +13,38 @@ st.set_page_config(
 
 import pandas as pd
 import numpy as np
-from modules.data import GLOBAL_INDICES, get_price_data
-from modules.network import correlation_matrix, build_network, mst_network, hierarchical_clustering
-from modules.portfolio import hrp_weights
+from modules.data import GLOBAL_INDICES, get_price_data, load_prices
+from modules.network import correlation_matrix, partial_correlation_matrix, build_network, mst_network, hierarchical_clustering, cluster_linkage, correlation_distance, denoised_correlation_matrix, denoised_covariance
+from modules.information import mutual_information_matrix
+from modules.portfolio import hrp_weights, mean_variance_weights, min_volatility_weights, efficient_frontier
+from modules.community import community_weights
 from modules.analytics import performance_metrics
-from modules.visualization import plot_correlation_matrix, plot_network, plot_dendrogram
+from modules.panel import ReturnsPanel
+from modules.cache import StageCache
+from modules.backtest import STRATEGIES, walk_forward
+from modules.dynamic import rolling_networks, dynamic_summary, centrality_history
+from modules import instrumentation
+from modules.universe import UniverseMatrix, meta_stamp
+from modules.robustness import bootstrap_robustness, weight_bands, co_clustering, edge_persistence, centrality_bands
+from functools import partial
+from modules.visualization import plot_correlation_matrix, plot_network, plot_dendrogram, plot_efficient_frontier
 import matplotlib.pyplot as plt
 
-# Clear Streamlit cache to avoid stale data issues
-st.cache_data.clear()
+# Stage results persist across reruns; a widget change only recomputes the stages it feeds
+@st.cache_resource
+def get_stage_cache():
+    return StageCache()
+
+cache = get_stage_cache()
+
+# Memory-mapped universe matrix (built with `python -m modules.universe`), shared by every
+# session and, through the page cache, every process on the host. Keyed by the meta.json stamp,
+# so a rebuild is picked up on the next run; the previous matrix stays open for runs still using it.
+@st.cache_resource(max_entries=2)
+def get_universe(stamp):
+    return UniverseMatrix.open()
+
+universe = get_universe(meta_stamp())
 
 st.title("Network-Based / HRP & Correlation Graph Portfolios")
 st.markdown("""
@@ -47,6 +70,10 @@ selected_factor = st.sidebar.selectbox("Network Factor Type", factor_options, he
 strategy_options = ["HRP", "MST", "Cluster-Based", "Centrality-Based", "Equal Weight", "Mean-Variance", "Minimum Volatility"]
 selected_strategy = st.sidebar.selectbox("Portfolio Strategy", strategy_options, help="Select portfolio construction method")
 
+st.sidebar.header("Correlation Cleaning")
+denoise = st.sidebar.checkbox("Denoise Correlations (RMT)", value=False, help="Replace eigenvalues below the Marchenko-Pastur bound by their average. Applies to the Correlation factor (and the networks and MST built from it) and to HRP")
+detone = st.sidebar.checkbox("Remove Market Mode", value=False, disabled=not denoise, help="Also drop the largest eigenvalue (the common market factor) from the cleaned matrix")
+
 st.sidebar.header("Benchmark Selection")
 common_benchmarks = [
     "^GSPC", "^DJI", "^IXIC", "^FTSE", "^GDAXI", "^FCHI", "^N225", "^HSI", "^STOXX50E", "^SMI", "^AORD", "^GSPTSE", "BTC-USD", "ETH-USD"
@@ -59,21 +86,55 @@ metrics_options = ["Mean Return", "Volatility", "Sharpe", "Sortino", "Max Drawdo
 selected_metrics = st.sidebar.multiselect("Show Metrics", metrics_options, default=metrics_options, help="Choose which metrics to display")
 
 st.sidebar.header("Visualizations")
-viz_options = ["Correlation Matrix", "Correlation Graph", "Network Graph", "MST Network", "Dendrogram", "Drawdown"]
+viz_options = ["Correlation Matrix", "Correlation Graph", "Network Graph", "MST Network", "Dendrogram", "Dynamic Network", "Efficient Frontier", "Drawdown"]
 selected_viz = st.sidebar.multiselect("Show Visualizations", viz_options, default=viz_options, help="Select which visualizations to show")
 
+st.sidebar.header("Rebalancing")
+rebalance_mode = st.sidebar.selectbox("Weight Estimation", ["Full Sample", "Walk-Forward"], help="Estimate weights once, or re-estimate them on a rolling lookback at each rebalance date")
+rebalance_options = {"Weekly": "W", "Monthly": "M", "Quarterly": "Q"}
+rebalance_freq = st.sidebar.selectbox("Rebalance Frequency", list(rebalance_options.keys()), index=1)
+lookback = st.sidebar.slider("Lookback (days)", min_value=20, max_value=756, value=252, step=21, help="Estimation window for each rebalance")
+expanding = st.sidebar.checkbox("Expanding Window", value=False, help="Use all history up to each rebalance date instead of a fixed lookback")
+
 # Sidebar: Sample split for in-sample/out-of-sample analysis
 st.sidebar.header("Sample Split")
 split_options = ["Total Sample", "In-Sample", "Out-of-Sample"]
 split_choice = st.sidebar.selectbox("Select Sample", split_options, help="Choose which sample to visualize and evaluate")
 split_ratio = st.sidebar.slider("In-Sample Ratio", min_value=0.1, max_value=0.9, value=0.7, step=0.05, help="Proportion of data for in-sample")
 
-prices = get_price_data(tickers, start_date, end_date)
+st.sidebar.header("Diagnostics")
+profile = st.sidebar.checkbox("Profile Pipeline", value=instrumentation.ENABLED, help="Record time, input sizes and call counts for each pipeline stage of this render")
+trace_memory = st.sidebar.checkbox("Trace Memory", value=instrumentation.TRACE_MEMORY, disabled=not profile, help="Also record peak memory per stage (slower)")
+robustness = st.sidebar.checkbox("Bootstrap Robustness", value=False, help="Re-estimate HRP weights, clusters and the threshold network on block-bootstrap resamples of the returns")
+bootstrap_samples = st.sidebar.number_input("Bootstrap Samples", min_value=50, max_value=5000, value=500, step=50, disabled=not robustness)
+# Profiling switches and stats are per browser session; the checkbox defaults come from PIPELINE_PROFILE
+if "profile_session" not in st.session_state:
+    st.session_state["profile_session"] = instrumentation.Session()
+instrumentation.activate(st.session_state["profile_session"])
+if profile:
+    instrumentation.enable(memory=trace_memory)
+    instrumentation.reset()
+else:
+    instrumentation.disable()
+
+# Today's date is part of the key so prices refresh once a day
+today = pd.Timestamp.today().date()
+if not tickers:
+    prices, load_report = pd.DataFrame(), pd.Series(dtype=object)
+elif universe is not None and universe.covers(tickers, start_date, end_date):
+    # Column views of the universe matrix, no download or per-ticker file reads
+    prices, load_report = cache.run(f"universe@{universe.version}", universe.load, tuple(tickers), start_date, end_date)
+else:
+    prices, load_report = cache.run(f"prices@{today}", load_prices, tuple(tickers), start_date, end_date)
+dropped = load_report[load_report != "ok"]
+if not dropped.empty:
+    with st.sidebar.expander(f"Data Report ({len(dropped)} tickers dropped)"):
+        st.dataframe(dropped.rename("Status"))
 benchmark_prices = None
 if selected_benchmark != "None":
-    benchmark_prices = get_price_data([selected_benchmark], start_date, end_date)
+    benchmark_prices = cache.run(f"prices@{today}", get_price_data, (selected_benchmark,), start_date, end_date)
     if not benchmark_prices.empty:
-        benchmark = np.log(benchmark_prices[selected_benchmark] / benchmark_prices[selected_benchmark].shift(1)).dropna()
+        benchmark = cache.run("returns", ReturnsPanel.from_prices, benchmark_prices).returns[selected_benchmark].dropna()
     else:
         benchmark = None
 else:
@@ -174,18 +235,19 @@ if selected_page == "Project Guide & Glossary":
     st.stop()
 
 if not prices.empty:
-    returns = np.log(prices / prices.shift(1)).dropna()
+    panel = cache.run("returns", ReturnsPanel.from_prices, prices)
+    returns = panel.returns
     # Compute correlation matrix for network construction
-    if selected_factor == "Correlation":
-        corr = correlation_matrix(prices)
+    if selected_factor == "Correlation" and denoise:
+        corr = cache.run("correlation", denoised_correlation_matrix, panel, detone=detone)
+    elif selected_factor == "Correlation":
+        corr = cache.run("correlation", correlation_matrix, panel)
     elif selected_factor == "Partial Correlation":
-        # Placeholder: implement partial correlation if available
-        corr = correlation_matrix(prices)  # fallback
+        corr = cache.run("correlation", partial_correlation_matrix, panel)
     elif selected_factor == "Mutual Information":
-        # Placeholder: implement mutual information if available
-        corr = correlation_matrix(prices)  # fallback
+        corr = cache.run("correlation", mutual_information_matrix, panel)
     else:
-        corr = correlation_matrix(prices)
+        corr = cache.run("correlation", correlation_matrix, panel)
     n = len(returns)
     split_idx = int(n * split_ratio)
     if split_choice == "In-Sample":
@@ -198,28 +260,64 @@ if not prices.empty:
         sample_returns = returns
         sample_port_returns = None
     # Portfolio weights logic (expand for more strategies)
-    if selected_strategy == "HRP":
-        weights, cluster_map = hrp_weights(prices)
+    if selected_strategy == "HRP" and denoise:
+        cov = cache.run("covariance", denoised_covariance, panel, detone=detone)
+        weights, cluster_map = cache.run("weights", hrp_weights, None, cov=cov)
+    elif selected_strategy == "HRP":
+        weights, cluster_map = cache.run("weights", hrp_weights, panel)
+    elif selected_strategy == "Cluster-Based":
+        # Louvain communities of the threshold network, inverse variance inside each
+        weights, cluster_map = cache.run("weights", community_weights, panel)
+    elif selected_strategy == "Centrality-Based":
+        # Communities as above, tilted towards peripheral (weakly connected) assets
+        weights, cluster_map = cache.run("weights", community_weights, panel, within="peripheral")
+    elif selected_strategy == "MST":
+        # Communities of the MST, tilted towards each branch's hubs
+        weights, cluster_map = cache.run("weights", community_weights, panel, network="mst", within="central")
+    elif selected_strategy == "Mean-Variance":
+        # Long-only, shrunk covariance, risk aversion 5
+        weights = cache.run("weights", mean_variance_weights, panel)
+        cluster_map = {t: 1 for t in prices.columns}
+    elif selected_strategy == "Minimum Volatility":
+        weights = cache.run("weights", min_volatility_weights, panel)
+        cluster_map = {t: 1 for t in prices.columns}
     elif selected_strategy == "Equal Weight":
         weights = pd.Series(1 / len(prices.columns), index=prices.columns)
         cluster_map = {t: 1 for t in prices.columns}
     else:
         weights = pd.Series(1 / len(prices.columns), index=prices.columns)
         cluster_map = {t: 1 for t in prices.columns}
+    realized_turnover = None
+    if rebalance_mode == "Walk-Forward" and len(returns) > lookback:
+        strategy = STRATEGIES.get(selected_strategy, STRATEGIES["Equal Weight"])
+        if selected_strategy == "HRP" and denoise:
+            strategy = partial(strategy, denoise=True, detone=detone)
+        backtest = cache.run("weights", walk_forward, panel, strategy=strategy, lookback=lookback, frequency=rebalance_options[rebalance_freq], expanding=expanding)
+        weights = backtest["weights"].iloc[-1]
+        port_returns = backtest["returns"]
+        realized_turnover = backtest["turnover"].iloc[1:].mean() if len(backtest["turnover"]) > 1 else 0.0
+    else:
+        if rebalance_mode == "Walk-Forward":
+            st.warning("Not enough history for the selected lookback; using full-sample weights.")
+        port_returns = cache.run("portfolio", ReturnsPanel.portfolio_returns, panel, weights)
     st.write("Asset Clusters:", cluster_map)
     st.write("Portfolio Weights:", weights)
-    port_returns = (returns * weights).sum(axis=1)
     # Sample-specific portfolio returns
+    # Split by date so walk-forward returns (which start after the first lookback) line up
+    split_date = returns.index[min(split_idx, n - 1)]
     if split_choice == "In-Sample":
-        sample_port_returns = port_returns.iloc[:split_idx]
+        sample_port_returns = port_returns[port_returns.index < split_date]
     elif split_choice == "Out-of-Sample":
-        sample_port_returns = port_returns.iloc[split_idx:]
+        sample_port_returns = port_returns[port_returns.index >= split_date]
     else:
         sample_port_returns = port_returns
     st.line_chart(sample_port_returns.cumsum(), use_container_width=True)
-    G = build_network(corr, threshold=0.5) if "Network Graph" in selected_viz else None
-    perf = performance_metrics(sample_port_returns, benchmark=benchmark, weights=weights.values, network=G)
+    G = cache.run("network", build_network, corr, threshold=0.5)
+    perf = cache.run("metrics", performance_metrics, sample_port_returns, benchmark=benchmark, weights=weights.values,
+                     network=G if "Network Graph" in selected_viz else None, turnover=realized_turnover)
     if benchmark is not None and "Market Risk Premium" in selected_metrics:
+        # A copy: the cached dict is shared with every other session
+        perf = dict(perf)
         perf["Market Risk Premium"] = sample_port_returns.mean() - benchmark.mean()
     st.subheader("Performance Metrics Summary (Tearsheet)")
     perf_table = pd.DataFrame({k: [perf.get(k, None)] for k in selected_metrics})
@@ -228,40 +326,76 @@ if not prices.empty:
     # Show all selected visualizations
     if "Correlation Matrix" in selected_viz:
         st.subheader("Correlation Matrix")
-        fig = plot_correlation_matrix(corr)
-        st.plotly_chart(fig, use_container_width=True)
+        fig = cache.run("figure", plot_correlation_matrix, corr)
+        st.plotly_chart(fig, use_container_width=True, key="correlation_matrix")
     if "Correlation Graph" in selected_viz:
         st.subheader("Correlation Graph")
-        # For correlation graph, build a network from the correlation matrix
-        G_corr = build_network(corr, threshold=0.5)
-        fig = plot_network(G_corr)
-        st.plotly_chart(fig, use_container_width=True)
+        # Same thresholded network as the metrics use
+        fig = cache.run("figure", plot_network, G)
+        st.plotly_chart(fig, use_container_width=True, key="correlation_graph")
     if "Network Graph" in selected_viz:
         st.subheader("Network Graph")
-        G = build_network(corr, threshold=0.5)
-        fig = plot_network(G)
-        st.plotly_chart(fig, use_container_width=True)
+        fig = cache.run("figure", plot_network, G)
+        st.plotly_chart(fig, use_container_width=True, key="network_graph")
     if "MST Network" in selected_viz:
         st.subheader("Minimum Spanning Tree (MST) Network")
-        mst = mst_network(corr)
-        fig = plot_network(mst)
-        st.plotly_chart(fig, use_container_width=True)
+        mst = cache.run("mst", mst_network, corr)
+        fig = cache.run("figure", plot_network, mst, kind="mst")
+        st.plotly_chart(fig, use_container_width=True, key="mst_network")
     if "Dendrogram" in selected_viz:
         st.subheader("Dendrogram")
-        from scipy.cluster.hierarchy import linkage
-        if 'corr' in locals():
-            # Convert correlation to distance for linkage
-            dist = 1 - corr
-            Z = linkage(dist, method='ward')
-            labels = list(prices.columns)
-            fig = plot_dendrogram(Z, labels)
-            st.plotly_chart(fig, use_container_width=True)
+        # Same tree as HRP and its cluster map (shared linkage cache)
+        if selected_strategy == "HRP" and denoise:
+            cleaned = cache.run("correlation", denoised_correlation_matrix, panel, detone=detone)
+            Z = cache.run("linkage", cluster_linkage, correlation_distance(cleaned))
+        else:
+            Z = cache.run("linkage", hierarchical_clustering, panel)
+        labels = list(prices.columns)
+        fig = cache.run("figure", plot_dendrogram, Z, labels)
+        st.plotly_chart(fig, use_container_width=True, key="dendrogram")
+    if "Dynamic Network" in selected_viz:
+        st.subheader("Dynamic Network")
+        # Rolling windows of the rebalancing lookback, stepped at the rebalance frequency
+        step = {"W": 5, "M": 21, "Q": 63}[rebalance_options[rebalance_freq]]
+        if len(returns) > lookback:
+            dynamic = cache.run("dynamic", rolling_networks, panel, window=lookback, step=step, threshold=0.5)
+            summary = dynamic_summary(dynamic)
+            st.line_chart(summary[["density", "mean_correlation", "edge_survival", "mst_survival"]], use_container_width=True)
+            st.line_chart(summary["tree_length"], use_container_width=True)
+            mst_degree = centrality_history(dynamic)
+            st.write("MST degree of the most connected assets")
+            st.line_chart(mst_degree[mst_degree.mean().nlargest(10).index], use_container_width=True)
+        else:
+            st.info("Not enough history for the selected lookback.")
+    if "Efficient Frontier" in selected_viz:
+        st.subheader("Efficient Frontier (long-only, shrunk covariance)")
+        frontier, _ = cache.run("frontier", efficient_frontier, panel)
+        st.plotly_chart(plot_efficient_frontier(frontier), use_container_width=True)
     if "Drawdown" in selected_viz:
         st.subheader("Drawdown Visualization")
         cum_returns = sample_port_returns.cumsum()
         drawdown = cum_returns - cum_returns.cummax()
         st.line_chart(drawdown, use_container_width=True)
+    if robustness:
+        st.subheader("Bootstrap Robustness (HRP and threshold network)")
+        boot = cache.run("robustness", bootstrap_robustness, panel, samples=int(bootstrap_samples))
+        st.write("HRP weights: estimate and 90% bootstrap band")
+        st.dataframe(weight_bands(boot))
+        st.write("Co-clustering frequency (share of resamples in the same HRP cluster)")
+        st.plotly_chart(plot_correlation_matrix(co_clustering(boot), title="Co-Clustering Frequency"), use_container_width=True, key="co_clustering")
+        st.write("Edge persistence (share of resamples containing each edge)")
+        st.dataframe(edge_persistence(boot))
+        st.write("Betweenness centrality: estimate and 90% bootstrap band")
+        st.dataframe(centrality_bands(boot, "betweenness"))
 else:
     st.info("Select assets to view network and portfolio.")
 
+if profile:
+    with st.expander("Pipeline Profile"):
+        st.caption("Stages computed in this render; results served from the stage cache do not appear")
+        st.dataframe(instrumentation.summary())
+        st.write("Stage cache:", cache.stats())
+        st.download_button("Export JSON", instrumentation.to_json(), file_name="pipeline_profile.json", mime="application/json")
+        st.download_button("Export Prometheus", instrumentation.to_prometheus(), file_name="pipeline_profile.prom", mime="text/plain")
+
 st.markdown("---")
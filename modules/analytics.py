@@ -5,47 +5,96 @@
 
 import numpy as np
 import pandas as pd
-from sklearn.linear_model import LinearRegression
-import networkx as nx
+from modules.centrality import network_centrality
+from modules.instrumentation import instrument
+from modules.panel import ReturnsPanel
 
-def performance_metrics(returns, benchmark=None, weights=None, network=None):
-    mean_return = returns.mean()
-    volatility = returns.std()
-    sharpe = mean_return / volatility if volatility != 0 else np.nan
-    downside = returns[returns < 0].std()
-    sortino = mean_return / downside if downside != 0 else np.nan
-    cum_returns = returns.cumsum()
-    max_drawdown = (cum_returns - cum_returns.cummax()).min()
-    calmar = mean_return / abs(max_drawdown) if max_drawdown != 0 else np.nan
-    turnover = np.sum(np.abs(np.diff(weights))) / len(weights) if weights is not None else np.nan
-    # Alpha/Beta (vs benchmark)
-    alpha, beta, info_ratio = np.nan, np.nan, np.nan
-    if benchmark is not None and len(benchmark) == len(returns):
-        X = benchmark.values.reshape(-1, 1)
-        y = returns.values
-        reg = LinearRegression().fit(X, y)
-        beta = reg.coef_[0]
-        alpha = reg.intercept_
-        info_ratio = (returns.mean() - benchmark.mean()) / (returns - benchmark).std() if (returns - benchmark).std() != 0 else np.nan
-    # Downside deviation
-    downside_dev = np.sqrt(np.mean(np.minimum(returns, 0) ** 2))
-    # Network centrality metrics
-    centrality = {}
-    if network is not None:
-        centrality['degree'] = nx.degree_centrality(network)
-        centrality['betweenness'] = nx.betweenness_centrality(network)
-        centrality['eigenvector'] = nx.eigenvector_centrality(network)
-    return {
-        "Mean Return": mean_return,
+METRIC_COLUMNS = ["Mean Return", "Volatility", "Sharpe", "Sortino", "Max Drawdown", "Calmar Ratio",
+                  "Alpha", "Beta", "Information Ratio", "Downside Deviation"]
+
+def _nanstd(x, valid):
+    count = valid.sum(axis=0)
+    mean = np.where(valid, x, 0).sum(axis=0) / np.maximum(count, 1)
+    ss = np.where(valid, (x - mean) ** 2, 0).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(count > 1, np.sqrt(ss / (count - 1)), np.nan)
+
+def _ratio(num, den):
+    # x / y with NaN where y == 0, as in the single-series metrics
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(den != 0, num / np.where(den != 0, den, 1), np.nan)
+
+@instrument
+def performance_table(returns, benchmark=None):
+    # Column-wise metrics for a T x K matrix of portfolio returns; one row per portfolio.
+    # Missing values are skipped per column, like the pandas reductions in performance_metrics.
+    frame = returns.to_frame() if isinstance(returns, pd.Series) else pd.DataFrame(returns)
+    R = frame.to_numpy(dtype=float)
+    valid = ~np.isnan(R)
+    count = valid.sum(axis=0)
+    with np.errstate(invalid="ignore"):
+        mean = np.where(valid, R, 0).sum(axis=0) / np.where(count > 0, count, np.nan)
+    volatility = _nanstd(R, valid)
+    downside = _nanstd(R, R < 0)
+    # Drawdown of the cumulative (summed log) return, peaks taken over observed bars only
+    cum = np.nancumsum(R, axis=0)
+    peak = np.maximum.accumulate(np.where(valid, cum, -np.inf), axis=0)
+    with np.errstate(invalid="ignore"):
+        drawdown = np.where(valid, cum - peak, np.inf).min(axis=0)
+    max_drawdown = np.where(count > 0, drawdown, np.nan)
+    alpha = beta = info_ratio = np.full(R.shape[1], np.nan)
+    if benchmark is not None and len(benchmark) == len(R):
+        b = np.asarray(benchmark, dtype=float).reshape(-1, 1)
+        both = valid & ~np.isnan(b)
+        n = both.sum(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mx = np.where(both, b, 0).sum(axis=0) / n
+            my = np.where(both, R, 0).sum(axis=0) / n
+            sxy = np.where(both, (b - mx) * (R - my), 0).sum(axis=0)
+            sxx = np.where(both, (b - mx) ** 2, 0).sum(axis=0)
+            beta = sxy / sxx
+        alpha = my - beta * mx
+        tracking = _nanstd(R - b, both)
+        info_ratio = _ratio(mean - np.nanmean(b), tracking)
+    with np.errstate(invalid="ignore"):
+        downside_dev = np.sqrt(np.where(valid, np.minimum(R, 0) ** 2, 0).sum(axis=0) / np.where(count > 0, count, np.nan))
+    table = pd.DataFrame({
+        "Mean Return": mean,
         "Volatility": volatility,
-        "Sharpe": sharpe,
-        "Sortino": sortino,
+        "Sharpe": _ratio(mean, volatility),
+        "Sortino": _ratio(mean, downside),
         "Max Drawdown": max_drawdown,
-        "Calmar Ratio": calmar,
+        "Calmar Ratio": _ratio(mean, np.abs(max_drawdown)),
         "Alpha": alpha,
         "Beta": beta,
         "Information Ratio": info_ratio,
-        "Turnover": turnover,
         "Downside Deviation": downside_dev,
+    }, index=frame.columns)
+    return table[METRIC_COLUMNS]
+
+@instrument
+def performance_metrics(returns, benchmark=None, weights=None, network=None, turnover=None):
+    if isinstance(returns, ReturnsPanel):
+        # Asset panel plus weights: evaluate the weighted portfolio
+        returns = returns.portfolio_returns(weights)
+        weights = np.asarray(weights)
+    metrics = performance_table(returns, benchmark).iloc[0].to_dict()
+    # Realized turnover (e.g. from a walk-forward backtest) takes precedence over the weight dispersion proxy
+    if turnover is None:
+        turnover = np.sum(np.abs(np.diff(weights))) / len(weights) if weights is not None else np.nan
+    # Network centrality metrics
+    centrality = network_centrality(network) if network is not None else {}
+    return {
+        "Mean Return": metrics["Mean Return"],
+        "Volatility": metrics["Volatility"],
+        "Sharpe": metrics["Sharpe"],
+        "Sortino": metrics["Sortino"],
+        "Max Drawdown": metrics["Max Drawdown"],
+        "Calmar Ratio": metrics["Calmar Ratio"],
+        "Alpha": metrics["Alpha"],
+        "Beta": metrics["Beta"],
+        "Information Ratio": metrics["Information Ratio"],
+        "Turnover": turnover,
+        "Downside Deviation": metrics["Downside Deviation"],
         "Centrality Scores": centrality
     }
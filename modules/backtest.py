@@ -0,0 +1,117 @@
+# Project by @QuantDevJayson
+# GitHub: https://github.com/QuantDevJayson
+# PyPI: https://pypi.org/user/jayson.ashioya
+# LinkedIn: https://www.linkedin.com/in/jayson-ashioya-c-082814176/
+
+import inspect
+import os
+
+import numpy as np
+import pandas as pd
+from modules.panel import ReturnsPanel, as_panel
+from modules.community import community_weights
+from modules.network import denoised_covariance
+from modules.parallel import shared_array_pool
+from modules.portfolio import hrp_weights, mean_variance_weights, min_volatility_weights
+
+# Walk-forward backtesting: weights are re-estimated on a rolling (or expanding) lookback at each
+# rebalance date and held until the next one. Strategies take a returns DataFrame and return weights.
+# A strategy with a `state` parameter gets one dict that is carried from each rebalance to the next
+# (e.g. the last communities or optimizer solution); those run in rebalance order in this process,
+# so their results do not depend on the number of workers.
+
+def hrp_strategy(returns, denoise=False, detone=False):
+    panel = ReturnsPanel(returns)
+    if denoise:
+        return hrp_weights(None, cov=denoised_covariance(panel, detone=detone))[0]
+    return hrp_weights(panel)[0]
+
+def equal_weight_strategy(returns):
+    return pd.Series(1 / returns.shape[1], index=returns.columns)
+
+def cluster_strategy(returns, state=None):
+    return community_weights(ReturnsPanel(returns), state=state)[0]
+
+def centrality_strategy(returns, state=None):
+    return community_weights(ReturnsPanel(returns), within="peripheral", state=state)[0]
+
+def mst_strategy(returns, state=None):
+    return community_weights(ReturnsPanel(returns), network="mst", within="central", state=state)[0]
+
+def _warm_started(optimizer, returns, state):
+    # The previous rebalance's solution on the same assets warm-starts the optimizer
+    last = state.get("solution") if state is not None else None
+    init = last[1] if last is not None and last[0] == tuple(returns.columns) else None
+    weights = optimizer(ReturnsPanel(returns), init=init)
+    if state is not None:
+        state["solution"] = (tuple(returns.columns), weights.to_numpy())
+    return weights
+
+def mean_variance_strategy(returns, state=None):
+    return _warm_started(mean_variance_weights, returns, state)
+
+def min_volatility_strategy(returns, state=None):
+    return _warm_started(min_volatility_weights, returns, state)
+
+STRATEGIES = {
+    "HRP": hrp_strategy,
+    "MST": mst_strategy,
+    "Cluster-Based": cluster_strategy,
+    "Centrality-Based": centrality_strategy,
+    "Equal Weight": equal_weight_strategy,
+    "Mean-Variance": mean_variance_strategy,
+    "Minimum Volatility": min_volatility_strategy,
+}
+
+def rebalance_points(dates, lookback, frequency):
+    # Bar positions where weights are reset: every `frequency` bars, or the first bar of each
+    # calendar period for a pandas frequency string ("W", "M", "Q", ...)
+    if isinstance(frequency, (int, np.integer)):
+        return np.arange(lookback, len(dates), frequency)
+    periods = pd.DatetimeIndex(dates).to_period(frequency)
+    starts = np.flatnonzero(periods[1:] != periods[:-1]) + 1
+    return np.union1d([lookback], starts[starts > lookback]) if lookback < len(dates) else np.array([], dtype=int)
+
+# Worker state: the returns array, attached from shared memory once per process
+_worker = {}
+
+def _attach(values, tickers):
+    _worker.update(values=values, tickers=tickers)
+
+def _estimate(task, state=None):
+    strategy, lo, hi = task
+    window = pd.DataFrame(_worker["values"][lo:hi], columns=_worker["tickers"])
+    window = window.dropna(axis=1, how="all")
+    weights = strategy(window) if state is None else strategy(window, state=state)
+    return weights.reindex(_worker["tickers"]).fillna(0).to_numpy(dtype=float)
+
+def walk_forward(data, strategy=hrp_strategy, lookback=252, frequency="M", expanding=False, max_workers=None):
+    panel = as_panel(data)
+    values, tickers = panel.values, panel.tickers
+    points = rebalance_points(panel.dates, lookback, frequency)
+    if not len(points):
+        raise ValueError(f"Need more than {lookback} bars for a walk-forward backtest")
+    tasks = [(strategy, 0 if expanding else p - lookback, p) for p in points]
+    max_workers = max_workers or os.cpu_count() or 1
+    if "state" in inspect.signature(strategy).parameters:
+        _attach(values, tickers)
+        state = {}
+        weights = [_estimate(task, state) for task in tasks]
+    elif max_workers == 1 or len(tasks) == 1:
+        _attach(values, tickers)
+        weights = [_estimate(task) for task in tasks]
+    else:
+        # Windows are independent: share the returns array with the workers instead of pickling slices
+        with shared_array_pool(values, max_workers, _attach, (tickers,)) as pool:
+            weights = list(pool.map(_estimate, tasks, chunksize=max(1, len(tasks) // (4 * max_workers))))
+    weights = np.vstack(weights)
+    # Hold each set of weights from its rebalance bar until the next one
+    held = np.searchsorted(points, np.arange(points[0], len(values)), side="right") - 1
+    port = np.einsum("ij,ij->i", np.nan_to_num(values[points[0]:]), weights[held])
+    turnover = np.abs(np.diff(weights, axis=0, prepend=0)).sum(axis=1)
+    rebalance_dates = panel.dates[points]
+    return {
+        "returns": pd.Series(port, index=panel.dates[points[0]:]),
+        "weights": pd.DataFrame(weights, index=rebalance_dates, columns=tickers),
+        "turnover": pd.Series(turnover, index=rebalance_dates),
+    }
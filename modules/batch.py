@@ -0,0 +1,148 @@
+# Project by @QuantDevJayson
+# GitHub: https://github.com/QuantDevJayson
+# PyPI: https://pypi.org/user/jayson.ashioya
+# LinkedIn: https://www.linkedin.com/in/jayson-ashioya-c-082814176/
+
+import argparse
+import hashlib
+import itertools
+import os
+import re
+from concurrent.futures import as_completed
+from functools import partial
+
+import numpy as np
+import pandas as pd
+from modules.analytics import performance_metrics
+from modules.backtest import STRATEGIES, walk_forward
+from modules.data import GLOBAL_INDICES, default_store, load_prices
+from modules.information import mutual_information_matrix
+from modules.network import correlation_matrix, mst_edges, network_edges, partial_correlation_matrix
+from modules.panel import ReturnsPanel
+from modules.parallel import process_pool
+
+# Headless pipeline: data -> network -> portfolio -> analytics for every combination of universe,
+# factor, strategy and benchmark, written as Parquet files under one directory per job.
+#
+#   python -m modules.batch --universe US Europe --factor correlation partial --strategy HRP \
+#       --start 2020-01-01 --end 2025-07-31 --out results
+#
+# A job directory is complete once its _SUCCESS marker exists; reruns skip those jobs.
+
+FACTORS = {
+    "correlation": correlation_matrix,
+    "partial": partial_correlation_matrix,
+    # Jobs already run in parallel, so the MI engine stays in-process
+    "mutual_information": partial(mutual_information_matrix, max_workers=1),
+}
+
+
+def job_id(job):
+    slug = "_".join(re.sub(r"[^A-Za-z0-9]+", "-", str(job[k])).strip("-") for k in ("universe", "factor", "strategy"))
+    digest = hashlib.sha1(repr(sorted(job.items())).encode()).hexdigest()[:10]
+    return f"{slug}_{digest}"
+
+
+def universe_tickers(universe):
+    if universe in GLOBAL_INDICES:
+        return list(dict.fromkeys(GLOBAL_INDICES[universe]))
+    return [t.strip() for t in universe.split(",") if t.strip()]
+
+
+def run_job(job, out_dir, failed=None):
+    # Workers only read the store main() filled; failed holds that prefetch's errors per ticker
+    path = os.path.join(out_dir, job_id(job))
+    os.makedirs(path, exist_ok=True)
+    prices, report = load_prices(universe_tickers(job["universe"]), job["start"], job["end"], fetch=False, failed=failed)
+    report.rename("status").rename_axis("ticker").reset_index().to_parquet(os.path.join(path, "load_report.parquet"))
+    if prices.shape[1] < 2:
+        raise ValueError(f"{job['universe']}: fewer than two tickers with usable prices")
+    panel = ReturnsPanel.from_prices(prices)
+    corr = FACTORS[job["factor"]](panel)
+    tickers = np.asarray(panel.tickers, dtype=object)
+    for name, (rows, cols, values) in (("network_edges", network_edges(corr, job["threshold"])), ("mst_edges", mst_edges(corr))):
+        pd.DataFrame({"source": tickers[rows], "target": tickers[cols], "weight": values}).to_parquet(os.path.join(path, f"{name}.parquet"))
+    strategy = STRATEGIES[job["strategy"]]
+    turnover = None
+    if job["lookback"]:
+        backtest = walk_forward(panel, strategy=strategy, lookback=job["lookback"], frequency=job["rebalance"], max_workers=1)
+        weights, port_returns = backtest["weights"].iloc[-1], backtest["returns"]
+        turnover = backtest["turnover"].iloc[1:].mean() if len(backtest["turnover"]) > 1 else 0.0
+        backtest["weights"].rename_axis("date").reset_index().to_parquet(os.path.join(path, "weights_history.parquet"))
+    else:
+        weights = strategy(panel.returns)
+        port_returns = panel.portfolio_returns(weights)
+    weights.rename("weight").rename_axis("ticker").reset_index().to_parquet(os.path.join(path, "weights.parquet"))
+    port_returns.rename("return").rename_axis("date").reset_index().to_parquet(os.path.join(path, "returns.parquet"))
+    benchmark = None
+    if job["benchmark"]:
+        bench_prices, _ = load_prices([job["benchmark"]], job["start"], job["end"], fetch=False)
+        if not bench_prices.empty:
+            bench = ReturnsPanel.from_prices(bench_prices).returns.iloc[:, 0]
+            port_returns, benchmark = port_returns.align(bench, join="inner")
+    metrics = performance_metrics(port_returns, benchmark=benchmark, weights=weights.values, turnover=turnover)
+    metrics.pop("Centrality Scores")
+    row = {**{k: str(v) for k, v in job.items()}, **metrics, "assets": prices.shape[1], "days": len(panel.dates)}
+    pd.DataFrame([row]).to_parquet(os.path.join(path, "metrics.parquet"))
+    # Written last: marks the job complete for resumed runs
+    open(os.path.join(path, "_SUCCESS"), "w").close()
+    return path
+
+
+def expand_jobs(args):
+    universes = list(GLOBAL_INDICES) if args.all_universes else args.universe
+    grid = itertools.product(universes, args.factor, args.strategy, args.benchmark or [""], args.lookback)
+    return [
+        {"universe": u, "factor": f, "strategy": s, "benchmark": b, "start": args.start, "end": args.end,
+         "threshold": args.threshold, "lookback": lb, "rebalance": args.rebalance}
+        for u, f, s, b, lb in grid
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the network portfolio pipeline without the dashboard")
+    parser.add_argument("--universe", nargs="+", default=["US"], help="GLOBAL_INDICES region names or comma-separated ticker lists")
+    parser.add_argument("--all-universes", action="store_true", help="Run every region in GLOBAL_INDICES")
+    parser.add_argument("--start", default="2020-01-01")
+    parser.add_argument("--end", default=str(pd.Timestamp.today().date()))
+    parser.add_argument("--factor", nargs="+", default=["correlation"], choices=list(FACTORS))
+    parser.add_argument("--strategy", nargs="+", default=["HRP"], choices=list(STRATEGIES))
+    parser.add_argument("--benchmark", nargs="*", default=[], help="Benchmark tickers (one job per benchmark)")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Absolute correlation threshold for network edges")
+    parser.add_argument("--lookback", nargs="+", type=int, default=[0], help="Walk-forward lookback in days; 0 estimates weights on the full sample")
+    parser.add_argument("--rebalance", default="M", help="Walk-forward rebalance frequency (pandas period alias)")
+    parser.add_argument("--out", default="results")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--force", action="store_true", help="Rerun jobs whose outputs already exist")
+    args = parser.parse_args(argv)
+
+    jobs = expand_jobs(args)
+    pending = [j for j in jobs if args.force or not os.path.exists(os.path.join(args.out, job_id(j), "_SUCCESS"))]
+    print(f"{len(jobs)} jobs, {len(jobs) - len(pending)} already complete")
+    # Fill the shared price store from this process first, so the workers only read from it and
+    # tickers that failed here are not downloaded again by every job
+    store = default_store()
+    failed = {}
+    for universe in {j["universe"] for j in pending}:
+        failed.update(store.update(universe_tickers(universe), args.start, args.end))
+    benchmarks = sorted({j["benchmark"] for j in pending if j["benchmark"]})
+    if benchmarks:
+        failed.update(store.update(benchmarks, args.start, args.end))
+    if failed:
+        print(f"{len(failed)} tickers could not be fetched")
+
+    failures = 0
+    with process_pool(args.workers) as pool:
+        futures = {pool.submit(run_job, job, args.out, failed): job for job in pending}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                print(f"done  {future.result()}")
+            except Exception as e:
+                failures += 1
+                print(f"FAIL  {job_id(job)}: {type(e).__name__}: {e}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,129 @@
+# Project by @QuantDevJayson
+# GitHub: https://github.com/QuantDevJayson
+# PyPI: https://pypi.org/user/jayson.ashioya
+# LinkedIn: https://www.linkedin.com/in/jayson-ashioya-c-082814176/
+
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import networkx as nx
+from modules.panel import ReturnsPanel
+
+# Pipeline cache: every stage result is keyed by a hash of the stage name, the function and its
+# inputs. Results produced by an earlier stage are identified by that stage's key instead of being
+# re-hashed, so a change only invalidates the stages downstream of it. Entries are evicted LRU once
+# their estimated size exceeds max_bytes.
+#
+# One cache serves every dashboard session, so the bookkeeping runs under a lock; the stage itself
+# runs outside it, and two sessions missing on the same key both compute it.
+
+
+def _digest(parts):
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode())
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def nbytes(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(value.memory_usage(deep=False).sum()) if isinstance(value, pd.DataFrame) else int(value.memory_usage())
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, ReturnsPanel):
+        return value.values.nbytes * 4
+    if isinstance(value, nx.Graph):
+        return 200 * (value.number_of_nodes() + value.number_of_edges())
+    if isinstance(value, dict):
+        return sum(nbytes(v) for v in value.values()) + sys.getsizeof(value)
+    if isinstance(value, (tuple, list)):
+        return sum(nbytes(v) for v in value) + sys.getsizeof(value)
+    if hasattr(value, "to_plotly_json"):
+        # Plotly figures: rough flat estimate, they are small next to the matrices
+        return 2 ** 20
+    return sys.getsizeof(value)
+
+
+class StageCache:
+    def __init__(self, max_bytes=512 * 2 ** 20):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def fingerprint(self, value):
+        known = self._keys.get(id(value))
+        if known is not None and known[1] is value:
+            return known[0]
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            return _digest([type(value).__name__, value.shape,
+                            pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes(),
+                            list(value.columns) if isinstance(value, pd.DataFrame) else [value.name]])
+        if isinstance(value, np.ndarray):
+            return _digest([value.dtype, value.shape, np.ascontiguousarray(value).tobytes()])
+        if isinstance(value, ReturnsPanel):
+            return _digest(["panel", list(value.tickers), value.dates[0] if len(value.dates) else None,
+                            value.dates[-1] if len(value.dates) else None, value.values.dtype,
+                            value.values.tobytes()])
+        if isinstance(value, nx.Graph):
+            from modules.centrality import graph_fingerprint
+            return graph_fingerprint(value)
+        if isinstance(value, (list, tuple)):
+            return _digest([type(value).__name__] + [self.fingerprint(v) for v in value])
+        if isinstance(value, dict):
+            return _digest(["dict"] + [f"{k}={self.fingerprint(v)}" for k, v in sorted(value.items(), key=str)])
+        if callable(value):
+            return f"{getattr(value, '__module__', '')}.{getattr(value, '__qualname__', repr(value))}"
+        return repr(value)
+
+    def run(self, stage, fn, *args, **kwargs):
+        key = _digest([stage, self.fingerprint(fn)] + [self.fingerprint(a) for a in args]
+                      + [f"{k}={self.fingerprint(v)}" for k, v in sorted(kwargs.items())])
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+            self.misses += 1
+        value = fn(*args, **kwargs)
+        size = nbytes(value)
+        with self._lock:
+            if key in self._entries:
+                # Another session stored it meanwhile
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+            self._entries[key] = (value, size)
+            for part_key, part in self._parts(key, value):
+                self._keys[id(part)] = (part_key, part)
+            self.size += size
+            while self.size > self.max_bytes and len(self._entries) > 1:
+                old_key, (old_value, old_size) = self._entries.popitem(last=False)
+                self.size -= old_size
+                for part_key, part in self._parts(old_key, old_value):
+                    if self._keys.get(id(part), (None,))[0] == part_key:
+                        del self._keys[id(part)]
+        return value
+
+    @staticmethod
+    def _parts(key, value):
+        # A stage result and, for tuple results, each element, so downstream stages can key on them
+        yield key, value
+        if isinstance(value, tuple):
+            for i, part in enumerate(value):
+                yield f"{key}[{i}]", part
+
+    def clear(self):
+        self._entries.clear()
+        self._keys.clear()
+        self.size = 0
+
+    def stats(self):
+        return {"entries": len(self._entries), "bytes": self.size, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,132 @@
+# Project by @QuantDevJayson
+# GitHub: https://github.com/QuantDevJayson
+# PyPI: https://pypi.org/user/jayson.ashioya
+# LinkedIn: https://www.linkedin.com/in/jayson-ashioya-c-082814176/
+
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+import networkx as nx
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import eigsh
+from modules.instrumentation import instrument
+
+# Centrality on sparse adjacency matrices, cached by graph fingerprint
+
+EXACT_BETWEENNESS_LIMIT = 500
+CACHE_SIZE = 32
+_cache = OrderedDict()
+
+
+def graph_fingerprint(G, weight="weight"):
+    # Order-independent hash of the node set and weighted edge list
+    nodes = sorted(map(str, G.nodes()))
+    edges = sorted(
+        (min(str(u), str(v)), max(str(u), str(v)), round(float(d.get(weight, 1.0)), 12))
+        for u, v, d in G.edges(data=True)
+    )
+    return hashlib.sha1(repr((nodes, edges)).encode()).hexdigest()
+
+
+def adjacency(G, weight=None):
+    nodes = list(G.nodes())
+    A = nx.to_scipy_sparse_array(G, nodelist=nodes, weight=weight, format="csr")
+    return nodes, sparse.csr_matrix(abs(A), dtype=float)
+
+
+def degree_centrality(A):
+    n = A.shape[0]
+    degree = np.diff(A.indptr).astype(float)
+    return degree / (n - 1) if n > 1 else np.ones(n)
+
+
+def eigenvector_centrality(A):
+    # Leading eigenvector per connected component (so disconnected graphs are well defined),
+    # each scaled by sqrt(component share) for a unit Euclidean norm overall, as networkx reports
+    n = A.shape[0]
+    scores = np.zeros(n)
+    count, labels = connected_components(A, directed=False)
+    order = np.argsort(labels, kind="stable")
+    bounds = np.searchsorted(labels[order], np.arange(count + 1))
+    for c in range(count):
+        members = order[bounds[c]:bounds[c + 1]]
+        if len(members) == 1:
+            vector = np.ones(1)
+        else:
+            block = A[members][:, members]
+            if len(members) <= 64:
+                vector = np.linalg.eigh(block.toarray())[1][:, -1]
+            else:
+                vector = eigsh(block, k=1, which="LA", v0=np.ones(len(members)), tol=1e-10)[1][:, 0]
+        vector = np.abs(vector)
+        scores[members] = vector / np.linalg.norm(vector) * np.sqrt(len(members) / n)
+    return scores
+
+
+def betweenness_centrality(A, k=None, seed=0, batch=128):
+    # Brandes' algorithm run level-synchronously for a batch of sources at once with sparse
+    # mat-mats; k samples that many sources and rescales, as networkx does
+    n = A.shape[0]
+    if n <= 2:
+        return np.zeros(n)
+    A = (A != 0).astype(float).tocsr()
+    if k is None or k >= n:
+        sources = np.arange(n)
+    else:
+        sources = np.sort(np.random.default_rng(seed).choice(n, size=k, replace=False))
+    total = np.zeros(n)
+    for start in range(0, len(sources), batch):
+        src = sources[start:start + batch]
+        cols = np.arange(len(src))
+        sigma = np.zeros((n, len(src)))
+        sigma[src, cols] = 1.0
+        depth = np.full((n, len(src)), -1)
+        depth[src, cols] = 0
+        frontier = sigma.copy()
+        level = 0
+        while True:
+            reached = A @ frontier
+            reached[depth >= 0] = 0.0
+            new = reached > 0
+            if not new.any():
+                break
+            level += 1
+            depth[new] = level
+            sigma += reached
+            frontier = reached
+        delta = np.zeros_like(sigma)
+        for d in range(level, 0, -1):
+            outer = depth == d
+            coeff = np.where(outer, (1.0 + delta) / np.where(outer, sigma, 1.0), 0.0)
+            delta += np.where(depth == d - 1, sigma * (A @ coeff), 0.0)
+        delta[src, cols] = 0.0
+        total += delta.sum(axis=1)
+    scale = 1.0 / ((n - 1) * (n - 2)) * (n / len(sources))
+    return total * scale
+
+
+@instrument
+def network_centrality(G, k=None, seed=0, cache=True):
+    # Degree, betweenness and eigenvector centrality keyed by node. Betweenness is exact up to
+    # EXACT_BETWEENNESS_LIMIT nodes and sampled from that many sources above it unless k is given.
+    if G.number_of_nodes() == 0:
+        return {"degree": {}, "betweenness": {}, "eigenvector": {}}
+    if k is None and G.number_of_nodes() > EXACT_BETWEENNESS_LIMIT:
+        k = EXACT_BETWEENNESS_LIMIT
+    key = (graph_fingerprint(G), k, seed) if cache else None
+    if key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+    nodes, A = adjacency(G)
+    result = {
+        "degree": dict(zip(nodes, degree_centrality(A).tolist())),
+        "betweenness": dict(zip(nodes, betweenness_centrality(A, k=k, seed=seed).tolist())),
+        "eigenvector": dict(zip(nodes, eigenvector_centrality(A).tolist())),
+    }
+    if cache:
+        _cache[key] = result
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
@@ -0,0 +1,158 @@
+# Project by @QuantDevJayson
+# GitHub: https://github.com/QuantDevJayson
+# PyPI: https://pypi.org/user/jayson.ashioya
+# LinkedIn: https://www.linkedin.com/in/jayson-ashioya-c-082814176/
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse import linalg as splinalg
+from modules.instrumentation import instrument
+from modules.network import mst_edges, network_adjacency
+from modules.panel import as_panel
+
+# Community detection (Louvain) on sparse adjacency matrices and the community-based allocations
+# built on it. Consecutive windows can pass the previous graph and its communities along: when the
+# next graph has barely changed they are reused, otherwise Louvain starts from them instead of
+# singletons. Nothing is remembered between calls, so results never depend on what ran before.
+
+REUSE_TOLERANCE = 0.05
+
+
+def modularity(A, labels, resolution=1.0):
+    A = sparse.csr_matrix(A)
+    m2 = A.sum()
+    if m2 == 0:
+        return 0.0
+    k = np.asarray(A.sum(axis=1)).ravel()
+    coo = A.tocoo()
+    inside = coo.data[labels[coo.row] == labels[coo.col]].sum()
+    tot = np.bincount(labels, weights=k)
+    return inside / m2 - resolution * (tot ** 2).sum() / m2 ** 2
+
+
+def _local_moving(A, labels, resolution, m2, order, max_sweeps=32):
+    # Move single nodes to the neighbouring community with the best modularity gain. After the
+    # first sweep only nodes with a neighbour that moved are revisited.
+    indptr, indices, data = A.indptr, A.indices, A.data
+    k = np.asarray(A.sum(axis=1)).ravel()
+    tot = np.bincount(labels, weights=k, minlength=len(k))
+    active = np.ones(len(k), dtype=bool)
+    moved = False
+    for _ in range(max_sweeps):
+        moves = 0
+        for i in order[active[order]]:
+            active[i] = False
+            lo, hi = indptr[i], indptr[i + 1]
+            nbrs, w = indices[lo:hi], data[lo:hi]
+            keep = nbrs != i
+            if not keep.any():
+                continue
+            nbrs, w = nbrs[keep], w[keep]
+            current, ki = labels[i], k[i]
+            tot[current] -= ki
+            found, inverse = np.unique(labels[nbrs], return_inverse=True)
+            k_in = np.bincount(inverse, weights=w)
+            gains = k_in - resolution * tot[found] * ki / m2
+            own = np.flatnonzero(found == current)
+            stay = (k_in[own[0]] if len(own) else 0.0) - resolution * tot[current] * ki / m2
+            best = np.argmax(gains)
+            target = found[best] if gains[best] > stay + 1e-12 else current
+            labels[i] = target
+            tot[target] += ki
+            if target != current:
+                moves += 1
+                active[nbrs] = True
+        if not moves:
+            break
+        moved = True
+    return labels, moved
+
+
+@instrument
+def louvain(A, resolution=1.0, initial=None, seed=0, max_levels=16):
+    # Community label per node of a symmetric non-negative sparse adjacency. `initial` seeds the
+    # first level with an existing partition (a warm start) instead of one community per node.
+    A = sparse.csr_matrix(A, dtype=float)
+    n = A.shape[0]
+    m2 = A.sum()
+    if n == 0 or m2 == 0:
+        return np.arange(n)
+    rng = np.random.default_rng(seed)
+    membership = np.arange(n)
+    graph = A
+    labels = np.unique(initial, return_inverse=True)[1] if initial is not None else np.arange(n)
+    for level in range(max_levels):
+        labels, moved = _local_moving(graph, labels.copy(), resolution, m2, rng.permutation(graph.shape[0]))
+        labels = np.unique(labels, return_inverse=True)[1]
+        membership = labels[membership]
+        count = labels.max() + 1
+        if (not moved and level > 0) or count == graph.shape[0]:
+            break
+        # Collapse each community into one node; internal weight becomes a self-loop
+        P = sparse.csr_matrix((np.ones(len(labels)), (np.arange(len(labels)), labels)), shape=(len(labels), count))
+        graph = (P.T @ graph @ P).tocsr()
+        labels = np.arange(count)
+    return membership
+
+
+def detect_communities(A, previous=None, resolution=1.0, seed=0, reuse_tolerance=REUSE_TOLERANCE):
+    # Louvain with reuse: `previous` is the (adjacency, labels) pair of the last graph on the same
+    # assets, e.g. the previous rebalance window. A relative Frobenius change up to reuse_tolerance
+    # keeps its labels; a larger one warm-starts Louvain from them.
+    A = sparse.csr_matrix(A, dtype=float)
+    initial = None
+    if previous is not None and previous[0].shape == A.shape:
+        old, labels = previous
+        scale = splinalg.norm(old)
+        if scale > 0 and splinalg.norm(A - old) <= reuse_tolerance * scale:
+            return labels
+        initial = labels
+    return louvain(A, resolution=resolution, initial=initial, seed=seed)
+
+
+def similarity_adjacency(corr, network="threshold", threshold=0.5):
+    # |corr| weights on the threshold network or on the MST edges
+    n = len(corr)
+    if network == "mst":
+        rows, cols, dist = mst_edges(corr)
+        weights = 1 - dist
+        return sparse.csr_matrix((np.r_[weights, weights], (np.r_[rows, cols], np.r_[cols, rows])), shape=(n, n))
+    return abs(network_adjacency(corr, threshold))
+
+
+@instrument
+def community_weights(prices, network="threshold", within="inverse_variance", threshold=0.5, resolution=1.0, state=None):
+    # Equal budget per community, split inside each one by
+    #   inverse_variance - 1 / asset variance
+    #   peripheral       - 1 / (1 + node strength), favouring weakly connected assets
+    #   central          - node strength, favouring hubs
+    # Returns (weights, cluster_map) like hrp_weights, with communities numbered from 1.
+    # state is a dict carried from one window to the next (see backtest.walk_forward); it holds
+    # the last graph and communities for the reuse above.
+    panel = as_panel(prices)
+    tickers = panel.tickers
+    A = similarity_adjacency(panel.correlation.to_numpy(), network, threshold)
+    key = (network, threshold, tuple(tickers))
+    last = state.get("communities") if state is not None else None
+    labels = detect_communities(A, last[1:] if last is not None and last[0] == key else None, resolution=resolution)
+    if state is not None:
+        state["communities"] = (key, A, labels)
+    strength = np.asarray(A.sum(axis=1)).ravel()
+    if within == "inverse_variance":
+        score = 1 / np.diag(panel.covariance.to_numpy())
+    elif within == "peripheral":
+        score = 1 / (1 + strength)
+    elif within == "central":
+        score = strength
+    else:
+        raise ValueError(f"Unknown within-community rule: {within}")
+    score = np.nan_to_num(score, nan=0.0, posinf=0.0)
+    count = labels.max() + 1
+    totals = np.bincount(labels, weights=score, minlength=count)
+    sizes = np.bincount(labels, minlength=count)
+    # Communities whose scores are all zero (e.g. a lone node with no strength) split equally
+    share = np.where(totals[labels] > 0, score / np.where(totals[labels] > 0, totals[labels], 1), 1 / sizes[labels])
+    weights = pd.Series(share / count, index=tickers)
+    cluster_map = dict(zip(tickers, (labels + 1).tolist()))
+    return weights, cluster_map
@@ -3,9 +3,13 @@
 # PyPI: https://pypi.org/user/jayson.ashioya
 # LinkedIn: https://www.linkedin.com/in/jayson-ashioya-c-082814176/
 
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
 import yfinance as yf
 import pandas as pd
 import numpy as np
+from modules.instrumentation import instrument
+from modules.store import PriceStore
 
 # Expanded global indices, sectors, themes, and crypto tickers
 GLOBAL_INDICES = {
@@ -48,10 +52,9 @@ EQUITY_CATEGORIES = {
 }
 
 
-def get_price_data(tickers, start, end):
-    if not tickers:
-        return pd.DataFrame()
-    df = yf.download(tickers, start=start, end=end)
+@instrument
+def yahoo_backend(tickers, start, end):
+    df = yf.download(list(tickers), start=str(start), end=str(end), progress=False)
     # Handle both single and multi-ticker cases
     if "Adj Close" in df.columns:
         data = df["Adj Close"]
@@ -66,21 +69,115 @@ def get_price_data(tickers, start, end):
                 data = df
         else:
             data = df
-    return data.dropna()
+    if isinstance(data, pd.Series):
+        data = data.to_frame(tickers[0])
+    return data
+
+def _run_round(pool, max_workers, backend, batches, start, end, timeout):
+    # One pass over the batches; returns {batch index: frame or exception}
+    futures = {pool.submit(backend, batch, start, end): k for k, batch in enumerate(batches)}
+    budget = timeout * -(-len(batches) // max_workers)
+    done, pending = wait(futures, timeout=budget)
+    results = {}
+    for future in pending:
+        future.cancel()
+        results[futures[future]] = TimeoutError(f"no response after {timeout}s")
+    for future in done:
+        try:
+            results[futures[future]] = future.result()
+        except Exception as e:
+            results[futures[future]] = e
+    return results
+
+@instrument
+def bulk_fetch(tickers, start, end, backend=yahoo_backend, chunk_size=25, max_workers=8, retries=2, timeout=60):
+    # Fetch in chunks on a bounded thread pool; tickers a chunk did not deliver are retried one by one.
+    # Returns the fetched frame (empty tickers as all-NaN columns, failed tickers absent) and {ticker: error}.
+    tickers = list(dict.fromkeys(tickers))
+    frames, failed = [], {}
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        batches = [tickers[i:i + chunk_size] for i in range(0, len(tickers), chunk_size)]
+        for attempt in range(retries + 1):
+            pending = []
+            for k, result in _run_round(pool, max_workers, backend, batches, start, end, timeout).items():
+                if isinstance(result, Exception):
+                    failed.update({t: f"{type(result).__name__}: {result}" for t in batches[k]})
+                    pending += batches[k]
+                    continue
+                good = [t for t in batches[k] if t in result.columns and result[t].notna().any()]
+                frames.append(result[good])
+                for t in batches[k]:
+                    failed.pop(t, None)
+                pending += [t for t in batches[k] if t not in good]
+            if not pending:
+                break
+            batches = [[t] for t in pending]
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    data = pd.concat(frames, axis=1) if frames else pd.DataFrame()
+    data = data.reindex(columns=[t for t in tickers if t not in failed])
+    return data, failed
+
+def concurrent_backend(backend=yahoo_backend, **options):
+    # Adapts bulk_fetch to the store's backend interface; failures travel in the frame's attrs
+    def fetch(tickers, start, end):
+        data, failed = bulk_fetch(tickers, start, end, backend=backend, **options)
+        data.attrs["failed"] = failed
+        return data
+    return fetch
+
+PRICE_STORE_DIR = os.environ.get("PRICE_STORE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "network-portfolios"))
+_default_store = None
+
+def default_store():
+    global _default_store
+    if _default_store is None:
+        _default_store = PriceStore(PRICE_STORE_DIR, concurrent_backend(yahoo_backend))
+    return _default_store
+
+@instrument
+def load_prices(tickers, start, end, store=None, min_obs=20, fetch=True, failed=None):
+    # Prices aligned by date without a global dropna, so each pair keeps its own overlap,
+    # plus a per-ticker status: "ok", "empty", "short" or the fetch error. fetch=False only reads
+    # the store; `failed` then carries the errors of an earlier update for the report.
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        return pd.DataFrame(), pd.Series(dtype=object)
+    store = store or default_store()
+    failed = {**(failed or {}), **(store.update(tickers, start, end) if fetch else {})}
+    data = store.load(tickers, start, end)
+    counts = data.notna().sum()
+    report = pd.Series("ok", index=tickers, dtype=object)
+    report[counts < min_obs] = "short"
+    report[counts == 0] = "empty"
+    for ticker, reason in failed.items():
+        if ticker in report.index and counts[ticker] == 0:
+            report[ticker] = reason
+    data = data.loc[:, report == "ok"].dropna(how="all")
+    return data, report
+
+@instrument
+def get_price_data(tickers, start, end, store=None, min_obs=20):
+    return load_prices(tickers, start, end, store=store, min_obs=min_obs)[0]
 
 # Denoising utilities
 
+@instrument
 def rolling_mean(prices, window=5):
     return prices.rolling(window=window).mean()
 
+@instrument
 def zscore(prices):
     return (prices - prices.mean()) / prices.std()
 
+@instrument
 def winsorize(prices, limits=[0.01, 0.99]):
     lower = prices.quantile(limits[0])
     upper = prices.quantile(limits[1])
     return prices.clip(lower, upper)
 
+@instrument
 def denoise(prices):
     # Example: rolling mean + winsorization + z-score
     smoothed = rolling_mean(prices, window=5)
@@ -0,0 +1,77 @@
+# Project by @QuantDevJayson
+# GitHub: https://github.com/QuantDevJayson
+# PyPI: https://pypi.org/user/jayson.ashioya
+# LinkedIn: https://www.linkedin.com/in/jayson-ashioya-c-082814176/
+
+import numpy as np
+import pandas as pd
+from modules.network import mst_edges
+from modules.panel import as_panel
+from modules.streaming import StreamingCorrelation
+
+# Dynamic networks: a window of `window` bars moves through the sample `step` bars at a time.
+# Window moments are updated incrementally (each bar enters and leaves once, O(N^2) per bar) and
+# each step keeps only summary arrays, not graphs:
+#   density, mean_correlation, tree_length, edge_survival, mst_survival  - one value per step
+#   degree (threshold network), mst_degree                             - steps x assets
+#   mst_edges                                                          - steps x (N - 1) pair codes i * N + j
+
+
+def rolling_networks(prices, window=126, step=21, threshold=0.5):
+    panel = as_panel(prices)
+    n = len(panel.tickers)
+    engine = StreamingCorrelation(panel.tickers, window=window)
+    iu = np.triu_indices(n, 1)
+    stats = {k: [] for k in ("dates", "density", "mean_correlation", "tree_length", "edge_survival", "mst_survival",
+                             "degree", "mst_degree", "mst_edges")}
+    previous_mask = previous_tree = None
+    seen = 0
+    for date, x in zip(panel.dates, panel.values):
+        if np.isnan(x).any():
+            # Same rule as the engine: bars with missing values are skipped
+            continue
+        engine.update(x)
+        seen += 1
+        if engine.count < window or (seen - window) % step:
+            continue
+        corr = engine.correlation().to_numpy()
+        strength = np.abs(corr)
+        mask = strength[iu] > threshold
+        # Dense Prim on the window's correlations: O(N^2), the same order as one bar's moment update
+        rows, cols, dist = mst_edges(corr)
+        tree = np.sort(np.minimum(rows, cols) * n + np.maximum(rows, cols))
+        stats["dates"].append(date)
+        stats["density"].append(mask.mean() if len(mask) else np.nan)
+        stats["mean_correlation"].append(np.nanmean(corr[iu]) if len(mask) else np.nan)
+        stats["tree_length"].append(dist.sum())
+        stats["edge_survival"].append((mask & previous_mask).sum() / max(previous_mask.sum(), 1)
+                                      if previous_mask is not None else np.nan)
+        stats["mst_survival"].append(np.isin(tree, previous_tree, assume_unique=True).mean()
+                                     if previous_tree is not None and len(tree) else np.nan)
+        stats["degree"].append(((strength > threshold).sum(axis=1) - 1) / max(n - 1, 1))
+        stats["mst_degree"].append(np.bincount(rows, minlength=n) + np.bincount(cols, minlength=n))
+        stats["mst_edges"].append(tree)
+        previous_mask, previous_tree = mask, tree
+    steps = len(stats["dates"])
+    return {
+        "tickers": panel.tickers,
+        "dates": pd.DatetimeIndex(stats["dates"]),
+        "density": np.asarray(stats["density"], dtype=float),
+        "mean_correlation": np.asarray(stats["mean_correlation"], dtype=float),
+        "tree_length": np.asarray(stats["tree_length"], dtype=float),
+        "edge_survival": np.asarray(stats["edge_survival"], dtype=float),
+        "mst_survival": np.asarray(stats["mst_survival"], dtype=float),
+        "degree": np.asarray(stats["degree"], dtype=np.float32).reshape(steps, n),
+        "mst_degree": np.asarray(stats["mst_degree"], dtype=np.int32).reshape(steps, n),
+        "mst_edges": np.asarray(stats["mst_edges"], dtype=np.int64).reshape(steps, max(n - 1, 0)),
+    }
+
+
+def dynamic_summary(result):
+    # One row per window end with the scalar statistics
+    keys = ["density", "mean_correlation", "tree_length", "edge_survival", "mst_survival"]
+    return pd.DataFrame({k: result[k] for k in keys}, index=result["dates"])
+
+
+def centrality_history(result, key="mst_degree"):
+    return pd.DataFrame(result[key], index=result["dates"], columns=result["tickers"])
@@ -0,0 +1,116 @@
+# Project by @QuantDevJayson
+# GitHub: https://github.com/QuantDevJayson
+# PyPI: https://pypi.org/user/jayson.ashioya
+# LinkedIn: https://www.linkedin.com/in/jayson-ashioya-c-082814176/
+
+import hashlib
+import os
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from modules.panel import as_panel
+from modules.parallel import shared_array_pool
+
+# Mutual-information network factor. Returns are discretized once into quantile bins (uint8 codes);
+# pairwise MI then comes from joint histograms computed for a block of asset pairs per matrix product.
+
+BLOCK_BYTES = 64 * 2 ** 20
+CACHE_SIZE = 8
+_cache = OrderedDict()
+_worker = {}
+
+
+def discretize(values, bins=8):
+    # Per-column quantile bins by rank; missing values get the sentinel code `bins`
+    values = np.asarray(values, dtype=float)
+    missing = np.isnan(values)
+    ranks = np.argsort(np.argsort(np.where(missing, np.inf, values), axis=0, kind="stable"), axis=0)
+    valid = (~missing).sum(axis=0)
+    codes = (ranks * bins // np.maximum(valid, 1)).astype(np.uint8)
+    codes[missing] = bins
+    return codes
+
+
+def one_hot(codes, bins):
+    # T x (N * bins) indicator matrix; missing bars have no indicator set
+    T, n = codes.shape
+    hot = np.zeros((T, n * bins), dtype=np.float32)
+    t, j = np.nonzero(codes < bins)
+    hot[t, j * bins + codes[t, j]] = 1.0
+    return hot
+
+
+def _mi_block(hot, r0, r1, bins):
+    # MI between columns r0..r1 and every column from r0 on. The joint histograms of all these
+    # pairs come out of one matrix product of indicator columns; bars where either asset is
+    # missing have no indicator, so each pair uses its overlapping bars.
+    left = hot[:, r0 * bins:r1 * bins]
+    right = hot[:, r0 * bins:]
+    counts = (left.T @ right).astype(float)
+    counts = counts.reshape(r1 - r0, bins, -1, bins).transpose(0, 2, 1, 3)
+    total = counts.sum(axis=(2, 3))
+    px = counts.sum(axis=3)
+    py = counts.sum(axis=2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = counts * total[:, :, None, None] / (px[:, :, :, None] * py[:, :, None, :])
+        terms = np.where(counts > 0, counts * np.log(ratio), 0.0)
+        mi = terms.sum(axis=(2, 3)) / total
+        # Miller-Madow bias correction: H + (occupied cells - 1) / 2T for each entropy term
+        occupied = (px > 0).sum(axis=2) + (py > 0).sum(axis=2) - (counts > 0).sum(axis=(2, 3)) - 1
+        mi += occupied / (2 * total)
+    return np.where(total > 0, np.maximum(mi, 0.0), np.nan)
+
+
+def _attach(codes, bins):
+    # Workers receive the compact uint8 codes and expand the indicator matrix locally
+    _worker["hot"] = one_hot(codes, bins)
+    _worker["bins"] = bins
+
+
+def _run_block(task):
+    r0, r1 = task
+    return r0, _mi_block(_worker["hot"], r0, r1, _worker["bins"])
+
+
+def mutual_information(values, bins=8, max_workers=None):
+    # N x N mutual information (nats) of a T x N returns array
+    codes = discretize(values, bins)
+    T, n = codes.shape
+    # Each block's histogram array holds rows x N x bins^2 counts
+    rows_per_block = max(1, BLOCK_BYTES // max(n * bins * bins * 8 * 4, 1))
+    tasks = [(r0, min(r0 + rows_per_block, n)) for r0 in range(0, n, rows_per_block)]
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(tasks) == 1:
+        _attach(codes, bins)
+        results = list(map(_run_block, tasks))
+    else:
+        with shared_array_pool(codes, max_workers, _attach, (bins,)) as pool:
+            results = list(pool.map(_run_block, tasks))
+    mi = np.empty((n, n))
+    for r0, block in results:
+        mi[r0:r0 + len(block), r0:] = block
+        mi[r0:, r0:r0 + len(block)] = block.T
+    return mi
+
+
+def mutual_information_matrix(prices, bins=8, max_workers=None, cache=True):
+    # Linfoot information coefficient sqrt(1 - exp(-2 MI)): equals |rho| for Gaussian returns, so
+    # the result can be used wherever a correlation matrix is expected (build_network, mst_network)
+    # Keyed on the returns content: equal tickers and dates do not mean equal data (integer-indexed
+    # windows, refreshed prices, float32 universe panels)
+    panel = as_panel(prices)
+    digest = hashlib.blake2b(panel.values.tobytes(), digest_size=16).hexdigest()
+    key = (tuple(panel.tickers), panel.shape, str(panel.values.dtype), digest, bins)
+    if cache and key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+    mi = mutual_information(panel.values, bins=bins, max_workers=max_workers)
+    coefficient = np.sqrt(1 - np.exp(-2 * mi))
+    np.fill_diagonal(coefficient, 1.0)
+    result = pd.DataFrame(coefficient, index=panel.tickers, columns=panel.tickers)
+    if cache:
+        _cache[key] = result
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
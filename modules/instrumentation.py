@@ -0,0 +1,227 @@
+# Project by @QuantDevJayson
+# GitHub: https://github.com/QuantDevJayson
+# PyPI: https://pypi.org/user/jayson.ashioya
+# LinkedIn: https://www.linkedin.com/in/jayson-ashioya-c-082814176/
+
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import pandas as pd
+
+# Per-stage timing: @instrument on a function (or `with stage(name)` around a block) records call
+# count, wall time, the input sizes (assets, days, edges) and, with memory tracing on, the
+# tracemalloc peak. While disabled a wrapped call costs one flag check.
+#
+# PIPELINE_PROFILE=1 enables timing at import, PIPELINE_PROFILE=memory adds memory tracing.
+#
+# The switches and the recorded stats belong to a Session. Code outside any session (scripts,
+# benchmarks) uses the process default; the dashboard activates one Session per browser session,
+# so one user's toggles never change another's render. tracemalloc is process-wide: it starts with
+# the first session tracing memory and stops when the last one turns it off, and while several
+# sessions trace at once their allocations share one peak.
+
+ENABLED = os.environ.get("PIPELINE_PROFILE", "") not in ("", "0")
+TRACE_MEMORY = os.environ.get("PIPELINE_PROFILE", "") == "memory"
+PROMETHEUS_PREFIX = "network_portfolios_stage"
+_lock = threading.Lock()
+_frames = threading.local()
+_tracing = set()
+
+
+class Session:
+    def __init__(self, enabled=False, memory=False):
+        self.enabled, self.memory = enabled, memory
+        self.stats = {}
+        self.lock = threading.Lock()
+        _set_tracing(self, enabled and memory)
+        # A session dropped while tracing (e.g. a closed browser tab) releases tracemalloc too
+        weakref.finalize(self, _release, id(self))
+
+
+def _release(key):
+    with _lock:
+        _tracing.discard(key)
+        if not _tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def _set_tracing(session, on):
+    if not on:
+        return _release(id(session))
+    with _lock:
+        _tracing.add(id(session))
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+_default = Session(ENABLED, TRACE_MEMORY)
+_session = ContextVar("instrumentation_session", default=_default)
+
+
+def activate(session):
+    # Make `session` current for the rest of this thread's (or task's) context
+    _session.set(session)
+    return session
+
+
+def current():
+    return _session.get()
+
+
+def enable(memory=False):
+    session = _session.get()
+    session.enabled, session.memory = True, memory
+    _set_tracing(session, memory)
+
+
+def disable():
+    session = _session.get()
+    session.enabled, session.memory = False, False
+    _set_tracing(session, False)
+
+
+def reset():
+    session = _session.get()
+    with session.lock:
+        session.stats.clear()
+
+
+def sizes(*values):
+    # Assets, days and edges of the first argument that has them: a returns/price frame or panel
+    # is days x assets, a square matrix is assets x assets, a series is days, a graph has nodes and edges
+    for value in values:
+        if hasattr(value, "number_of_edges"):
+            return {"assets": value.number_of_nodes(), "edges": value.number_of_edges()}
+        if len(getattr(value, "shape", ())) == 2:
+            rows, cols = value.shape
+            return {"assets": cols} if rows == cols else {"assets": cols, "days": rows}
+        if isinstance(value, pd.Series):
+            return {"days": value.shape[0]}
+        if isinstance(value, (tuple, list)) and value and isinstance(value[0], str):
+            return {"assets": len(value)}
+    return {}
+
+
+def _record(session, name, seconds, found, peak):
+    with session.lock:
+        entry = session.stats.setdefault(name, {"calls": 0, "total_seconds": 0.0, "max_seconds": 0.0, "last_seconds": 0.0,
+                                         "assets": None, "days": None, "edges": None, "peak_bytes": None})
+        entry["calls"] += 1
+        entry["total_seconds"] += seconds
+        entry["max_seconds"] = max(entry["max_seconds"], seconds)
+        entry["last_seconds"] = seconds
+        entry.update(found)
+        if peak is not None:
+            entry["peak_bytes"] = max(entry["peak_bytes"] or 0, peak)
+
+
+@contextmanager
+def stage(name, *inputs, **known):
+    session = _session.get()
+    if not session.enabled:
+        yield
+        return
+    found = {**sizes(*inputs), **known}
+    stack = getattr(_frames, "stack", None)
+    if stack is None:
+        stack = _frames.stack = []
+    if session.memory and tracemalloc.is_tracing():
+        # Nested stages reset the peak, so each frame also keeps the highest peak its children saw
+        frame = [tracemalloc.get_traced_memory()[0], 0]
+        tracemalloc.reset_peak()
+    else:
+        frame = None
+    stack.append(frame)
+    start = time.perf_counter()
+    try:
+        yield found
+    finally:
+        seconds = time.perf_counter() - start
+        stack.pop()
+        peak = None
+        if frame is not None and tracemalloc.is_tracing():
+            high = max(tracemalloc.get_traced_memory()[1], frame[1])
+            peak = high - frame[0]
+            if stack and stack[-1] is not None:
+                stack[-1][1] = max(stack[-1][1], high)
+        _record(session, name, seconds, found, peak)
+
+
+def instrument(fn=None, name=None):
+    if fn is None:
+        return functools.partial(instrument, name=name)
+    label = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not _session.get().enabled:
+            return fn(*args, **kwargs)
+        with stage(label, *args) as found:
+            result = fn(*args, **kwargs)
+            if "edges" not in found and hasattr(result, "number_of_edges"):
+                found["edges"] = result.number_of_edges()
+            return result
+
+    return wrapper
+
+
+def summary():
+    session = _session.get()
+    with session.lock:
+        frame = pd.DataFrame.from_dict({k: dict(v) for k, v in session.stats.items()}, orient="index")
+    if frame.empty:
+        return frame
+    frame["mean_seconds"] = frame["total_seconds"] / frame["calls"]
+    return frame.rename_axis("stage").sort_values("total_seconds", ascending=False)
+
+
+def to_json(path=None):
+    session = _session.get()
+    with session.lock:
+        text = json.dumps({"timestamp": time.time(), "stages": session.stats}, indent=2, default=float)
+    if path is not None:
+        _write(path, text)
+    return text
+
+
+def to_prometheus(path=None):
+    # Text exposition format, e.g. for node_exporter's textfile collector
+    metrics = [
+        ("calls_total", "counter", "calls", "Number of calls"),
+        ("seconds_total", "counter", "total_seconds", "Total wall time in seconds"),
+        ("last_seconds", "gauge", "last_seconds", "Wall time of the last call in seconds"),
+        ("max_seconds", "gauge", "max_seconds", "Slowest call in seconds"),
+        ("peak_bytes", "gauge", "peak_bytes", "Peak traced memory in bytes"),
+        ("assets", "gauge", "assets", "Assets in the last call's input"),
+        ("days", "gauge", "days", "Days in the last call's input"),
+        ("edges", "gauge", "edges", "Edges in the last call's network"),
+    ]
+    lines = []
+    session = _session.get()
+    with session.lock:
+        for suffix, kind, field, help_text in metrics:
+            samples = [(name, entry[field]) for name, entry in sorted(session.stats.items()) if entry[field] is not None]
+            if not samples:
+                continue
+            lines.append(f"# HELP {PROMETHEUS_PREFIX}_{suffix} {help_text}")
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{suffix} {kind}")
+            lines += [f'{PROMETHEUS_PREFIX}_{suffix}{{stage="{name}"}} {value}' for name, value in samples]
+    text = "\n".join(lines) + "\n"
+    if path is not None:
+        _write(path, text)
+    return text
+
+
+def _write(path, text):
+    # Atomic replace, so a scraper never reads a half-written file
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
@@ -3,38 +3,233 @@
 # PyPI: https://pypi.org/user/jayson.ashioya
 # LinkedIn: https://www.linkedin.com/in/jayson-ashioya-c-082814176/
 
+import hashlib
+from collections import OrderedDict
+
 import numpy as np
 import pandas as pd
 import networkx as nx
 from scipy.cluster.hierarchy import linkage, dendrogram, fcluster
+from scipy import sparse
+from scipy.linalg import cho_factor, cho_solve
+from scipy.sparse.linalg import eigsh
+from scipy.spatial.distance import squareform
+from sklearn.covariance import empirical_covariance, ledoit_wolf, shrunk_covariance
 from sklearn.metrics import pairwise_distances
+from modules.instrumentation import instrument
+from modules.panel import as_panel
 
 # Network construction utilities
 
+@instrument
 def correlation_matrix(prices):
-    returns = np.log(prices / prices.shift(1)).dropna()
-    return returns.corr()
+    # Pairwise-complete correlations, so each pair uses its own overlapping dates
+    return as_panel(prices).correlation
+
+@instrument
+def partial_correlation_matrix(prices, shrinkage=None):
+    # Partial correlations from a Ledoit-Wolf shrunk correlation matrix, which stays invertible
+    # when assets outnumber observations. shrinkage=None estimates the intensity from the data.
+    panel = as_panel(prices)
+    X = np.nan_to_num(panel.standardized)
+    if shrinkage is None:
+        S = ledoit_wolf(X, assume_centered=True)[0]
+    else:
+        S = shrunk_covariance(empirical_covariance(X, assume_centered=True), shrinkage=shrinkage)
+    # One Cholesky factorization gives the precision matrix
+    precision = cho_solve(cho_factor(S, lower=True), np.eye(len(S)))
+    d = 1 / np.sqrt(np.diag(precision))
+    pcorr = -precision * np.outer(d, d)
+    np.fill_diagonal(pcorr, 1.0)
+    return pd.DataFrame(pcorr, index=panel.tickers, columns=panel.tickers)
+
+# Random-matrix cleaning: eigenvalues of a T x N sample correlation matrix of pure noise stay
+# below the Marchenko-Pastur edge (1 + sqrt(N/T))^2, so only the few above it carry signal
+EIGSH_MIN_SIZE = 400
+
+def marchenko_pastur_edge(n_assets, n_obs):
+    return (1 + np.sqrt(n_assets / n_obs)) ** 2
+
+@instrument
+def signal_eigenpairs(C, edge):
+    # Eigenpairs above edge, largest first. Large matrices use eigsh for the top k only,
+    # doubling k until the smallest one found falls below the edge.
+    n = len(C)
+    k = min(16, n - 2)
+    while n >= EIGSH_MIN_SIZE and k < n // 2:
+        vals, vecs = eigsh(C, k=k, which="LA", v0=np.ones(n))
+        if vals.min() < edge:
+            break
+        k = min(2 * k, n // 2)
+    else:
+        vals, vecs = np.linalg.eigh(C)
+    order = np.argsort(vals)[::-1]
+    keep = order[vals[order] > edge]
+    return vals[keep], vecs[:, keep]
+
+@instrument
+def denoise_correlation(corr, n_obs, detone=False):
+    # Eigenvalue clipping: noise eigenvalues are replaced by their mean, which keeps the trace.
+    # The noise eigenvectors are never formed, since they span the complement of the signal ones.
+    # detone=True also drops the market mode (the largest eigenvalue) from the result.
+    labels = getattr(corr, "columns", None)
+    C = np.nan_to_num(np.asarray(corr, dtype=float))
+    np.fill_diagonal(C, 1.0)
+    n = len(C)
+    vals, vecs = signal_eigenpairs(C, marchenko_pastur_edge(n, n_obs))
+    noise = (n - vals.sum()) / (n - len(vals)) if len(vals) < n else 0.0
+    if detone and len(vals):
+        vals, vecs, market = vals[1:], vecs[:, 1:], vecs[:, :1]
+        noise_part = noise * (np.eye(n) - market @ market.T - vecs @ vecs.T)
+    else:
+        noise_part = noise * (np.eye(n) - vecs @ vecs.T)
+    cleaned = (vecs * vals) @ vecs.T + noise_part
+    d = 1 / np.sqrt(np.diag(cleaned))
+    cleaned = np.clip(cleaned * np.outer(d, d), -1.0, 1.0)
+    np.fill_diagonal(cleaned, 1.0)
+    return pd.DataFrame(cleaned, index=labels, columns=labels) if labels is not None else cleaned
+
+@instrument
+def denoised_correlation_matrix(prices, detone=False):
+    panel = as_panel(prices)
+    return denoise_correlation(correlation_matrix(panel), len(panel.dates), detone=detone)
+
+@instrument
+def denoised_covariance(prices, detone=False):
+    # Sample variances around the cleaned correlation matrix
+    panel = as_panel(prices)
+    std = np.sqrt(np.diag(panel.covariance.to_numpy()))
+    return denoised_correlation_matrix(panel, detone=detone) * np.outer(std, std)
+
+# Rows per argpartition block when selecting each node's top_k links
+TOP_K_ROW_BLOCK = 256
+
+@instrument
+def network_edges(corr, threshold=0.5, top_k=None):
+    # Upper-triangle edge arrays (i < j) for |corr| > threshold, optionally
+    # restricted to each node's top_k strongest links
+    values = np.asarray(corr, dtype=float)
+    n = len(values)
+    # Two comparisons instead of an |corr| copy of the whole matrix
+    mask = values > threshold
+    mask |= values < -threshold
+    np.fill_diagonal(mask, False)
+    if top_k is not None and top_k < n - 1:
+        # Nodes with at most top_k candidate links keep them all; the others take their top_k by a
+        # per-row argpartition of |corr|, a block of rows at a time, so the cost stays O(N^2) however
+        # dense the candidates are. An edge stays when it is among the top_k of either end.
+        counts = mask.sum(axis=1)
+        light = np.flatnonzero(counts <= top_k)
+        light_rows, light_cols = np.nonzero(mask[light])
+        picked_rows, picked_cols = [light[light_rows]], [light_cols]
+        heavy = np.flatnonzero(counts > top_k) if top_k > 0 else np.empty(0, dtype=int)
+        for start in range(0, len(heavy), TOP_K_ROW_BLOCK):
+            block = heavy[start:start + TOP_K_ROW_BLOCK]
+            # Non-candidates are weaker than every candidate already; only NaNs and the diagonal
+            # need pushing down (masking all of them to -inf would slow argpartition on ties)
+            strength = values[block]
+            np.abs(strength, out=strength)
+            strength[np.isnan(strength)] = -np.inf
+            strength[np.arange(len(block)), block] = -np.inf
+            top = np.argpartition(strength, n - top_k, axis=1)[:, n - top_k:]
+            picked_rows.append(np.repeat(block, top_k))
+            picked_cols.append(top.ravel())
+        rows, cols = np.concatenate(picked_rows), np.concatenate(picked_cols)
+        keys = np.unique(np.minimum(rows, cols) * n + np.maximum(rows, cols))
+        rows, cols = np.divmod(keys, n)
+    else:
+        rows, cols = np.nonzero(mask)
+        upper = rows < cols
+        rows, cols = rows[upper], cols[upper]
+    return rows, cols, values[rows, cols]
 
-def build_network(corr, threshold=0.5):
+@instrument
+def network_adjacency(corr, threshold=0.5, top_k=None):
+    # Symmetric CSR adjacency holding the correlation of each retained edge
+    rows, cols, weights = network_edges(corr, threshold, top_k)
+    n = len(corr)
+    return sparse.csr_matrix(
+        (np.concatenate([weights, weights]), (np.concatenate([rows, cols]), np.concatenate([cols, rows]))),
+        shape=(n, n),
+    )
+
+@instrument
+def edges_to_graph(labels, rows, cols, weights):
+    labels = np.asarray(labels, dtype=object)
     G = nx.Graph()
-    for i in corr.columns:
-        for j in corr.columns:
-            if i != j and abs(corr.loc[i, j]) > threshold:
-                G.add_edge(i, j, weight=corr.loc[i, j])
+    G.add_weighted_edges_from(zip(labels[rows], labels[cols], weights.tolist()))
     return G
 
+@instrument
+def build_network(corr, threshold=0.5, top_k=None):
+    rows, cols, weights = network_edges(corr, threshold, top_k)
+    return edges_to_graph(corr.columns, rows, cols, weights)
+
+@instrument
+def mst_edges(corr):
+    # Dense O(N^2) Prim on 1 - |corr|, returns the tree as (parent, child, distance) arrays
+    dist = 1 - np.abs(np.asarray(corr, dtype=float))
+    dist[np.isnan(dist)] = np.inf
+    n = len(dist)
+    rows = np.empty(max(n - 1, 0), dtype=np.intp)
+    cols = np.empty_like(rows)
+    weights = np.empty(len(rows))
+    if n < 2:
+        return rows, cols, weights
+    parent = np.zeros(n, dtype=np.intp)
+    best = dist[0].copy()
+    best[0] = np.nan
+    for k in range(n - 1):
+        j = np.nanargmin(best)
+        rows[k], cols[k], weights[k] = parent[j], j, best[j]
+        best[j] = np.nan
+        closer = dist[j] < best
+        best[closer] = dist[j, closer]
+        parent[closer] = j
+    return rows, cols, weights
+
+@instrument
 def mst_network(corr):
     # Minimum Spanning Tree from correlation distances
-    dist = 1 - np.abs(corr)
-    G = nx.Graph()
-    for i in corr.columns:
-        for j in corr.columns:
-            if i != j:
-                G.add_edge(i, j, weight=dist.loc[i, j])
-    mst = nx.minimum_spanning_tree(G)
-    return mst
-
-def hierarchical_clustering(prices):
-    returns = np.log(prices / prices.shift(1)).dropna()
-    Z = linkage(returns.T, method="ward")
+    rows, cols, weights = mst_edges(corr)
+    return edges_to_graph(corr.columns, rows, cols, weights)
+
+# Hierarchical clustering on the condensed correlation distance sqrt((1 - rho) / 2). The linkage is
+# cached per universe, returns content and method, so HRP weights, cluster maps and the dendrogram
+# of the same returns share one tree. The key hashes the values rather than trusting the dates:
+# walk-forward windows arrive without a date index, so equal-length windows share their labels.
+# Ward is valid here because the distance is Euclidean between standardized return series.
+
+LINKAGE_METHODS = ("single", "average", "complete", "ward")
+LINKAGE_METHOD = "ward"
+LINKAGE_CACHE_SIZE = 32
+_linkages = OrderedDict()
+
+def correlation_distance(corr):
+    corr = np.clip(np.nan_to_num(np.asarray(corr, dtype=float)), -1.0, 1.0)
+    return squareform(np.sqrt(0.5 * (1 - corr)), checks=False)
+
+@instrument
+def cluster_linkage(distance, method=LINKAGE_METHOD, key=None):
+    # Linkage of a condensed distance vector; key (identifying the data behind it) enables the cache
+    if method not in LINKAGE_METHODS:
+        raise ValueError(f"Unknown linkage method: {method}")
+    if key is not None and (key, method) in _linkages:
+        _linkages.move_to_end((key, method))
+        return _linkages[(key, method)]
+    Z = linkage(distance, method=method)
+    Z.flags.writeable = False
+    if key is not None:
+        _linkages[(key, method)] = Z
+        while len(_linkages) > LINKAGE_CACHE_SIZE:
+            _linkages.popitem(last=False)
     return Z
+
+@instrument
+def hierarchical_clustering(prices, method=LINKAGE_METHOD, cache=True):
+    panel = as_panel(prices)
+    key = (tuple(panel.tickers), panel.shape, hashlib.blake2b(panel.values.tobytes(), digest_size=16).hexdigest()) if cache else None
+    if key is not None and (key, method) in _linkages:
+        _linkages.move_to_end((key, method))
+        return _linkages[(key, method)]
+    return cluster_linkage(np.nan_to_num(panel.distance, nan=np.sqrt(0.5)), method=method, key=key)
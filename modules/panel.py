@@ -0,0 +1,82 @@
+# Project by @QuantDevJayson
+# GitHub: https://github.com/QuantDevJayson
+# PyPI: https://pypi.org/user/jayson.ashioya
+# LinkedIn: https://www.linkedin.com/in/jayson-ashioya-c-082814176/
+
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+from scipy.spatial.distance import squareform
+
+# Log returns computed once per price frame, with derived products cached on first use
+
+
+class ReturnsPanel:
+    def __init__(self, returns, dtype=np.float64):
+        self.tickers = pd.Index(returns.columns)
+        self.dates = pd.Index(returns.index)
+        self.values = np.ascontiguousarray(returns.to_numpy(dtype=dtype))
+
+    @classmethod
+    def from_prices(cls, prices, dtype=np.float64):
+        return cls(np.log(prices / prices.shift(1)).dropna(how="all"), dtype=dtype)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @cached_property
+    def complete(self):
+        return not np.isnan(self.values).any()
+
+    @cached_property
+    def returns(self):
+        return pd.DataFrame(self.values, index=self.dates, columns=self.tickers, copy=False)
+
+    @cached_property
+    def covariance(self):
+        if self.complete:
+            cov = np.cov(self.values, rowvar=False)
+            return pd.DataFrame(np.atleast_2d(cov), index=self.tickers, columns=self.tickers)
+        # Pairwise-complete observations when histories differ
+        return self.returns.cov()
+
+    @cached_property
+    def correlation(self):
+        if self.complete:
+            cov = self.covariance.to_numpy()
+            std = np.sqrt(np.diag(cov))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                corr = cov / np.outer(std, std)
+            np.fill_diagonal(corr, np.where(std > 0, 1.0, np.nan))
+            return pd.DataFrame(corr, index=self.tickers, columns=self.tickers)
+        return self.returns.corr()
+
+    @cached_property
+    def standardized(self):
+        mean = np.nanmean(self.values, axis=0)
+        std = np.nanstd(self.values, axis=0, ddof=1)
+        return (self.values - mean) / std
+
+    @cached_property
+    def distance(self):
+        # Condensed correlation distance sqrt((1 - rho) / 2)
+        corr = np.clip(self.correlation.to_numpy(), -1.0, 1.0)
+        return squareform(np.sqrt(0.5 * (1 - corr)), checks=False)
+
+    def portfolio_returns(self, weights):
+        weights = pd.Series(weights, index=self.tickers) if not isinstance(weights, pd.Series) else weights.reindex(self.tickers)
+        return pd.Series(np.nan_to_num(self.values) @ weights.fillna(0).to_numpy(), index=self.dates)
+
+    def window(self, start=None, stop=None):
+        # Row slice sharing the underlying array
+        panel = ReturnsPanel.__new__(ReturnsPanel)
+        panel.tickers = self.tickers
+        panel.dates = self.dates[start:stop]
+        panel.values = self.values[start:stop]
+        return panel
+
+
+def as_panel(data):
+    return data if isinstance(data, ReturnsPanel) else ReturnsPanel.from_prices(data)
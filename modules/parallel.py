@@ -0,0 +1,43 @@
+# Project by @QuantDevJayson
+# GitHub: https://github.com/QuantDevJayson
+# PyPI: https://pypi.org/user/jayson.ashioya
+# LinkedIn: https://www.linkedin.com/in/jayson-ashioya-c-082814176/
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Process pools for the parallel estimators. Workers are spawned rather than forked: the dashboard's
+# server and download threads must not leak into them. An input array shared by every task is
+# copied into shared memory once instead of being pickled with each task.
+
+# The shared-memory block a worker has attached, kept open for the life of the process
+_shm = {}
+
+
+def process_pool(max_workers, initializer=None, initargs=()):
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=initializer, initargs=initargs)
+
+
+def _attach(name, shape, dtype, initializer, initargs):
+    shm = shared_memory.SharedMemory(name=name)
+    _shm["block"] = shm
+    initializer(np.ndarray(shape, dtype=dtype, buffer=shm.buf), *initargs)
+
+
+@contextmanager
+def shared_array_pool(values, max_workers, initializer, initargs=()):
+    # Pool whose workers each call initializer(values, *initargs) once, with values read from
+    # shared memory; the block is released when the pool has shut down
+    shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    try:
+        np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[:] = values
+        with process_pool(max_workers, _attach, (shm.name, values.shape, values.dtype, initializer, initargs)) as pool:
+            yield pool
+    finally:
+        shm.close()
+        shm.unlink()
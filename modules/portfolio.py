@@ -5,21 +5,222 @@
 
 import numpy as np
 import pandas as pd
-from scipy.cluster.hierarchy import fcluster
+from scipy.cluster.hierarchy import fcluster, leaves_list
+from modules.instrumentation import instrument
+from modules.panel import as_panel
 
-# HRP Portfolio Construction
+# HRP Portfolio Construction (Lopez de Prado, 2016)
 
-def hrp_weights(prices):
-    from modules.network import hierarchical_clustering
-    Z = hierarchical_clustering(prices)
+@instrument
+def hrp_allocation(cov, Z):
+    # Quasi-diagonalize the covariance by the dendrogram leaf order, then bisect the ordered
+    # list recursively, splitting each cluster's weight by inverse cluster variance.
+    cov = np.asarray(cov, dtype=float)
+    order = leaves_list(Z)
+    n = len(order)
+    ivp = 1 / np.diag(cov)[order]
+    # Summed-area table of diag(ivp) C diag(ivp): any block's quadratic form in O(1)
+    area = cov[np.ix_(order, order)]
+    area *= ivp[:, None]
+    area *= ivp[None, :]
+    np.cumsum(area, axis=0, out=area)
+    np.cumsum(area, axis=1, out=area)
+    ivp_sum = np.concatenate([[0.0], np.cumsum(ivp)])
+
+    def corner(i, j):
+        return np.where((i > 0) & (j > 0), area[i - 1, j - 1], 0.0)
+
+    def cluster_variance(a, b):
+        block = corner(b, b) - corner(a, b) - corner(b, a) + corner(a, a)
+        return block / (ivp_sum[b] - ivp_sum[a]) ** 2
+
+    weights = np.ones(n)
+    starts, stops = np.array([0]), np.array([n])
+    while len(starts):
+        mid = (starts + stops) // 2
+        left, right = cluster_variance(starts, mid), cluster_variance(mid, stops)
+        alpha = 1 - left / (left + right)
+        bounds = np.column_stack([starts, mid, stops])
+        factors = np.column_stack([alpha, 1 - alpha]).ravel()
+        lengths = np.diff(bounds, axis=1).ravel()
+        # Positions covered by the clusters being split at this level
+        covered = np.zeros(n + 1, dtype=int)
+        np.add.at(covered, starts, 1)
+        np.add.at(covered, stops, -1)
+        index = np.flatnonzero(np.cumsum(covered[:-1]))
+        weights[index] *= np.repeat(factors, lengths)
+        nxt = bounds[:, [0, 1, 1, 2]].reshape(-1, 2)
+        keep = nxt[:, 1] - nxt[:, 0] > 1
+        starts, stops = nxt[keep, 0], nxt[keep, 1]
+    result = np.empty(n)
+    result[order] = weights
+    return result
+
+@instrument
+def hrp_weights(prices, cov=None, Z=None, method=None):
+    # prices may be a price frame, a ReturnsPanel, or None when cov (and optionally Z) are given.
+    # Without Z the tree comes from the shared linkage cache (see network.hierarchical_clustering).
+    from modules.network import LINKAGE_METHOD, cluster_linkage, correlation_distance, hierarchical_clustering
+    method = method or LINKAGE_METHOD
+    panel = as_panel(prices) if prices is not None else None
+    if cov is None:
+        cov = panel.covariance
+    assets = panel.tickers if panel is not None else getattr(cov, "columns", pd.RangeIndex(len(cov)))
+    if Z is None:
+        if panel is not None:
+            Z = hierarchical_clustering(panel, method=method)
+        else:
+            c = np.asarray(cov, dtype=float)
+            std = np.sqrt(np.diag(c))
+            Z = cluster_linkage(correlation_distance(c / np.outer(std, std)), method=method)
+    weights = pd.Series(hrp_allocation(cov, Z), index=assets)
     clusters = fcluster(Z, t=2, criterion="maxclust")
-    assets = prices.columns
     cluster_map = dict(zip(assets, clusters))
-    # Equal weight within cluster
-    weights = pd.Series(0, index=assets)
-    for c in np.unique(clusters):
-        members = [a for a in assets if cluster_map[a] == c]
-        for m in members:
-            weights[m] = 1 / len(members)
-    weights /= weights.sum()
     return weights, cluster_map
+
+# Mean-variance optimization: maximize mu'w - (gamma / 2) w'Cw subject to sum(w) = 1 and
+# lower <= w <= upper, on annualized Ledoit-Wolf shrunk moments. The unconstrained closed form is
+# used when it already lies inside the box; otherwise accelerated projected gradient runs for all
+# risk aversions at once (one matrix product per iteration), and each solution is polished by
+# solving the KKT system on its free assets.
+
+TRADING_DAYS = 252
+RISK_AVERSION = 5.0
+
+@instrument
+def shrunk_moments(prices):
+    # Annualized mean returns and Ledoit-Wolf covariance; missing returns count as zero
+    from sklearn.covariance import ledoit_wolf
+    panel = as_panel(prices)
+    X = np.nan_to_num(panel.values.astype(float))
+    mu = X.mean(axis=0) * TRADING_DAYS
+    cov = ledoit_wolf(X)[0] * TRADING_DAYS
+    return mu, cov
+
+def project_box_simplex(V, lower=0.0, upper=1.0):
+    # Row-wise Euclidean projection onto {lower <= w <= upper, sum(w) = 1}: w = clip(v - tau).
+    # sum(clip(v - tau)) is piecewise linear in tau with kinks at v - upper and v - lower, so
+    # sorting the kinks locates tau exactly for every row at once.
+    V = np.atleast_2d(V)
+    k, n = V.shape
+    lower = np.broadcast_to(lower, (n,))
+    upper = np.broadcast_to(upper, (n,))
+    kinks = np.concatenate([V - upper, V - lower], axis=1)
+    events = np.concatenate([np.ones((k, n)), -np.ones((k, n))], axis=1)
+    order = np.argsort(kinks, axis=1, kind="stable")
+    kinks = np.take_along_axis(kinks, order, axis=1)
+    # Assets strictly between their bounds on each interval (kink j, kink j + 1)
+    free = np.cumsum(np.take_along_axis(events, order, axis=1), axis=1)
+    totals = upper.sum() - np.concatenate([np.zeros((k, 1)), np.cumsum(free[:, :-1] * np.diff(kinks, axis=1), axis=1)], axis=1)
+    j = np.clip((totals > 1).sum(axis=1) - 1, 0, 2 * n - 1)
+    rows = np.arange(k)
+    slope = np.maximum(free[rows, j], 1)
+    tau = kinks[rows, j] + (totals[rows, j] - 1) / slope
+    return np.clip(V - tau[:, None], lower, upper)
+
+def _closed_form(mu, cov, gammas):
+    # Unconstrained (budget only) optimum for each risk aversion
+    inv_one, inv_mu = np.linalg.solve(cov, np.column_stack([np.ones(len(mu)), mu])).T
+    a, b = inv_one.sum(), inv_mu.sum()
+    return inv_mu[None, :] / gammas[:, None] + ((1 - b / gammas) / a)[:, None] * inv_one[None, :]
+
+def _polish(mu, cov, gamma, w, lower, upper, tol=1e-10):
+    # Exact solution on the current free set; kept only if it is feasible and satisfies KKT
+    free = (w > lower + 1e-9) & (w < upper - 1e-9)
+    if not free.any():
+        return w
+    fixed = ~free
+    n_free = free.sum()
+    kkt = np.zeros((n_free + 1, n_free + 1))
+    kkt[:n_free, :n_free] = gamma * cov[np.ix_(free, free)]
+    kkt[:n_free, n_free] = kkt[n_free, :n_free] = 1.0
+    rhs = np.append(mu[free] - gamma * cov[np.ix_(free, fixed)] @ w[fixed], 1 - w[fixed].sum())
+    try:
+        solution = np.linalg.solve(kkt, rhs)
+    except np.linalg.LinAlgError:
+        return w
+    candidate = w.copy()
+    candidate[free] = solution[:n_free]
+    if (candidate < lower - tol).any() or (candidate > upper + tol).any():
+        return w
+    # Assets at a bound must not want to move inside it
+    grad = gamma * cov @ candidate - mu + solution[n_free]
+    at_lower = fixed & (candidate <= lower + 1e-9)
+    at_upper = fixed & (candidate >= upper - 1e-9)
+    if (grad[at_lower] < -1e-8).any() or (grad[at_upper] > 1e-8).any():
+        return w
+    return np.clip(candidate, lower, upper)
+
+@instrument
+def solve_mean_variance(mu, cov, risk_aversion, lower=0.0, upper=1.0, init=None, max_iter=3000, tol=1e-10):
+    # Weights for each risk aversion (one row per entry). init warm-starts the iterations,
+    # e.g. with the previous rebalance's solution.
+    mu, cov = np.asarray(mu, dtype=float), np.asarray(cov, dtype=float)
+    gammas = np.atleast_1d(np.asarray(risk_aversion, dtype=float))
+    n = len(mu)
+    lower = np.broadcast_to(np.asarray(lower, dtype=float), (n,))
+    upper = np.broadcast_to(np.asarray(upper, dtype=float), (n,))
+    if lower.sum() > 1 + 1e-12 or upper.sum() < 1 - 1e-12:
+        raise ValueError("Bounds admit no fully invested portfolio")
+    closed = _closed_form(mu, cov, gammas)
+    inside = ((closed >= lower - 1e-12) & (closed <= upper + 1e-12)).all(axis=1)
+    W = project_box_simplex(closed if init is None else np.broadcast_to(init, closed.shape), lower, upper)
+    todo = np.flatnonzero(~inside)
+    if len(todo):
+        g = gammas[todo]
+        step = 1 / (g * np.linalg.eigvalsh(cov)[-1])
+        X = W[todo].copy()
+        Y, t = X.copy(), np.ones(len(todo))
+        for iteration in range(1, max_iter + 1):
+            grad = (Y @ cov) * g[:, None] - mu
+            X_new = project_box_simplex(Y - step[:, None] * grad, lower, upper)
+            t_new = (1 + np.sqrt(1 + 4 * t * t)) / 2
+            Y = X_new + ((t - 1) / t_new)[:, None] * (X_new - X)
+            change = np.abs(X_new - X).max(axis=1)
+            X, t = X_new, t_new
+            # The active set settles long before the iterates do: try an exact solve on it
+            # every few iterations and retire the points where it passes the KKT check
+            done = change < tol
+            if iteration % 10 == 0 or iteration == max_iter:
+                for r in np.flatnonzero(~done):
+                    current = X[r]
+                    polished = _polish(mu, cov, g[r], current, lower, upper)
+                    if polished is not current:
+                        X[r], done[r] = polished, True
+            if done.any():
+                W[todo[done]] = X[done]
+                keep = ~done
+                todo, g, step, X, Y, t = todo[keep], g[keep], step[keep], X[keep], Y[keep], t[keep]
+                if not len(todo):
+                    break
+        W[todo] = X
+    W[inside] = closed[inside]
+    return W
+
+@instrument
+def mean_variance_weights(prices, risk_aversion=RISK_AVERSION, lower=0.0, upper=1.0, init=None):
+    panel = as_panel(prices)
+    mu, cov = shrunk_moments(panel)
+    return pd.Series(solve_mean_variance(mu, cov, risk_aversion, lower, upper, init=init)[0], index=panel.tickers)
+
+@instrument
+def min_volatility_weights(prices, lower=0.0, upper=1.0, init=None):
+    # Minimum variance is the mean-variance problem with zero expected returns
+    panel = as_panel(prices)
+    _, cov = shrunk_moments(panel)
+    return pd.Series(solve_mean_variance(np.zeros(len(cov)), cov, 1.0, lower, upper, init=init)[0], index=panel.tickers)
+
+@instrument
+def efficient_frontier(prices, points=40, lower=0.0, upper=1.0, risk_aversions=None):
+    # Long-only (or boxed) frontier from the most aggressive to the minimum-variance end;
+    # returns (summary with return / volatility / risk_aversion, weights), one row per point
+    panel = as_panel(prices)
+    mu, cov = shrunk_moments(panel)
+    gammas = np.logspace(-1, 3, points) if risk_aversions is None else np.asarray(risk_aversions, dtype=float)
+    W = solve_mean_variance(mu, cov, gammas, lower, upper)
+    summary = pd.DataFrame({
+        "risk_aversion": gammas,
+        "return": W @ mu,
+        "volatility": np.sqrt(np.einsum("ij,jk,ik->i", W, cov, W)),
+    })
+    return summary, pd.DataFrame(W, columns=panel.tickers)
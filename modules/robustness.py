@@ -0,0 +1,140 @@
+# Project by @QuantDevJayson
+# GitHub: https://github.com/QuantDevJayson
+# PyPI: https://pypi.org/user/jayson.ashioya
+# LinkedIn: https://www.linkedin.com/in/jayson-ashioya-c-082814176/
+
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.cluster.hierarchy import fcluster
+from modules.centrality import betweenness_centrality, degree_centrality, eigenvector_centrality
+from modules.instrumentation import instrument
+from modules.network import LINKAGE_METHOD, hierarchical_clustering, network_adjacency
+from modules.parallel import shared_array_pool
+from modules.panel import ReturnsPanel, as_panel
+from modules.portfolio import hrp_weights
+
+# Bootstrap robustness: the HRP tree and weights, the threshold network and its centralities are
+# re-estimated on circular block-bootstrap resamples of the returns. A resample is only a row index
+# array into one returns buffer, shared with the workers through shared memory. Workers sum the
+# co-clustering and edge counts over their chunk, so only N x N totals come back per chunk.
+#
+# Betweenness is sampled from BETWEENNESS_SOURCES sources per resample; averaged over resamples this
+# costs little accuracy and is most of the per-resample time saved.
+
+BETWEENNESS_SOURCES = 64
+CENTRALITIES = ("degree", "betweenness", "eigenvector")
+# Worker state: the returns array attached from shared memory once per process
+_worker = {}
+
+
+def block_bootstrap_indices(n_obs, samples, block=None, seed=0):
+    # samples x n_obs row indices: random starting bars, each followed by `block` consecutive
+    # bars (wrapping at the end), which keeps the short-range dependence of the returns
+    block = block or max(1, int(round(n_obs ** (1 / 3))))
+    blocks = -(-n_obs // block)
+    starts = np.random.default_rng(seed).integers(0, n_obs, size=(samples, blocks))
+    idx = (starts[:, :, None] + np.arange(block)) % n_obs
+    return idx.reshape(samples, -1)[:, :n_obs].astype(np.int32)
+
+
+def _attach(values, options):
+    _worker.update(values=values, options=options)
+
+
+def _estimate(values, options):
+    # One resample's (or the full sample's) weights, cluster labels, edges and centralities
+    panel = ReturnsPanel.__new__(ReturnsPanel)
+    panel.tickers = pd.RangeIndex(values.shape[1])
+    panel.dates = pd.RangeIndex(values.shape[0])
+    panel.values = values
+    # Every resample is new data, so caching its tree would only evict useful entries
+    Z = hierarchical_clustering(panel, method=options["method"], cache=False)
+    weights, _ = hrp_weights(panel, Z=Z)
+    labels = fcluster(Z, t=options["clusters"], criterion="maxclust") - 1
+    A = network_adjacency(panel.correlation.to_numpy(), options["threshold"])
+    centrality = np.vstack([
+        degree_centrality(A),
+        betweenness_centrality(A, k=options["sources"], seed=options["seed"]),
+        eigenvector_centrality(A),
+    ])
+    return weights.to_numpy(), labels, A, centrality
+
+
+def _run_chunk(indices):
+    values, options = _worker["values"], _worker["options"]
+    n = values.shape[1]
+    weights = np.empty((len(indices), n))
+    centrality = np.empty((len(indices), len(CENTRALITIES), n))
+    together = np.zeros((n, n), dtype=np.int32)
+    edges = np.zeros((n, n), dtype=np.int32)
+    for s, rows in enumerate(indices):
+        weights[s], labels, A, centrality[s] = _estimate(values[rows], options)
+        member = np.zeros((n, labels.max() + 1), dtype=np.float32)
+        member[np.arange(n), labels] = 1.0
+        together += (member @ member.T).astype(np.int32)
+        edges[A.nonzero()] += 1
+    return weights, together, edges, centrality
+
+
+@instrument
+def bootstrap_robustness(prices, samples=1000, block=None, threshold=0.5, clusters=2, method=LINKAGE_METHOD,
+                         sources=BETWEENNESS_SOURCES, seed=0, max_workers=None):
+    # Point estimates on the full sample plus their bootstrap distribution: per-resample weights
+    # and centralities, and how often each pair shares a cluster or an edge
+    panel = as_panel(prices)
+    values, tickers = np.nan_to_num(panel.values), panel.tickers
+    options = {"threshold": threshold, "clusters": clusters, "method": method, "sources": sources, "seed": seed}
+    indices = block_bootstrap_indices(len(values), samples, block, seed)
+    max_workers = max_workers or os.cpu_count() or 1
+    chunks = np.array_split(indices, min(samples, 4 * max_workers))
+    if max_workers == 1 or len(chunks) == 1:
+        _attach(values, options)
+        results = [_run_chunk(chunk) for chunk in chunks]
+    else:
+        with shared_array_pool(values, max_workers, _attach, (options,)) as pool:
+            results = list(pool.map(_run_chunk, chunks))
+    weights, labels, A, centrality = _estimate(values, options)
+    return {
+        "tickers": tickers,
+        "samples": samples,
+        "weights": np.vstack([r[0] for r in results]),
+        "co_clustering": sum(r[1] for r in results) / samples,
+        "edge_frequency": sum(r[2] for r in results) / samples,
+        "centrality": np.concatenate([r[3] for r in results]),
+        "estimate": {"weights": weights, "labels": labels + 1, "adjacency": A, "centrality": centrality},
+    }
+
+
+def _bands(draws, estimate, tickers, level):
+    lower, upper = np.quantile(draws, [(1 - level) / 2, (1 + level) / 2], axis=0)
+    return pd.DataFrame({"estimate": estimate, "mean": draws.mean(axis=0), "std": draws.std(axis=0, ddof=1),
+                         "lower": lower, "upper": upper}, index=tickers)
+
+
+def weight_bands(result, level=0.9):
+    return _bands(result["weights"], result["estimate"]["weights"], result["tickers"], level)
+
+
+def centrality_bands(result, metric="degree", level=0.9):
+    k = CENTRALITIES.index(metric)
+    return _bands(result["centrality"][:, k], result["estimate"]["centrality"][k], result["tickers"], level)
+
+
+def co_clustering(result):
+    # Share of resamples in which each pair of assets falls in the same cluster
+    return pd.DataFrame(result["co_clustering"], index=result["tickers"], columns=result["tickers"])
+
+
+def edge_persistence(result, min_frequency=0.0):
+    # Every pair that is an edge in the full-sample network or in some resample, with the share of
+    # resamples containing it, most persistent first
+    frequency = result["edge_frequency"]
+    estimate = result["estimate"]["adjacency"].toarray() != 0
+    rows, cols = np.nonzero(np.triu((frequency > 0) | estimate, k=1))
+    tickers = np.asarray(result["tickers"], dtype=object)
+    edges = pd.DataFrame({"source": tickers[rows], "target": tickers[cols], "frequency": frequency[rows, cols],
+                          "in_estimate": estimate[rows, cols]})
+    edges = edges[edges["frequency"] >= min_frequency]
+    return edges.sort_values("frequency", ascending=False, ignore_index=True)
@@ -0,0 +1,184 @@
+# Project by @QuantDevJayson
+# GitHub: https://github.com/QuantDevJayson
+# PyPI: https://pypi.org/user/jayson.ashioya
+# LinkedIn: https://www.linkedin.com/in/jayson-ashioya-c-082814176/
+
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from urllib.parse import quote
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+
+# Local price store: one memory-mapped .npy file per ticker holding (date, close) rows,
+# plus a coverage file recording which [start, end) range has already been requested.
+# One store serves every dashboard session: updates are serialized by a lock, files are written
+# through unique temporary names, and coverage is merged with the file on disk before saving,
+# so another process's updates are kept. Each read-merge-write also holds an flock on the store's
+# lock file, so two processes (the dashboard and a batch run) cannot interleave and drop rows.
+
+RECORD = np.dtype([("date", "datetime64[D]"), ("close", "f8")])
+
+
+def _day(value):
+    return np.datetime64(pd.Timestamp(value).date(), "D")
+
+
+def csv_backend(directory):
+    # Offline stand-in for yfinance: reads <directory>/<ticker>.csv with Date and Close columns
+    def fetch(tickers, start, end):
+        frames = {}
+        for ticker in tickers:
+            path = os.path.join(directory, f"{ticker}.csv")
+            if not os.path.exists(path):
+                continue
+            df = pd.read_csv(path, index_col=0, parse_dates=True)
+            frames[ticker] = df["Close"].loc[pd.Timestamp(start):pd.Timestamp(end) - pd.Timedelta(days=1)]
+        return pd.DataFrame(frames)
+    return fetch
+
+
+class PriceStore:
+    def __init__(self, root, backend):
+        self.root = root
+        self.backend = backend
+        os.makedirs(root, exist_ok=True)
+        self._coverage_path = os.path.join(root, "coverage.json")
+        self._lock_path = os.path.join(root, ".lock")
+        self._lock = threading.RLock()
+        self.coverage = self._read_coverage()
+
+    def _read_coverage(self):
+        if not os.path.exists(self._coverage_path):
+            return {}
+        with open(self._coverage_path) as f:
+            return json.load(f)
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(self._lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _path(self, ticker):
+        return os.path.join(self.root, quote(ticker, safe="") + ".npy")
+
+    def read(self, ticker):
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return np.empty(0, dtype=RECORD)
+        return np.load(path, mmap_mode="r")
+
+    def _replace(self, path, write, mode):
+        # Write to a unique temporary file and rename it over path
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, mode) as f:
+                write(f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _write(self, ticker, records):
+        self._replace(self._path(ticker), lambda f: np.save(f, records), "wb")
+
+    def _save_coverage(self):
+        with self._lock, self._file_lock():
+            for ticker, (lo, hi) in self._read_coverage().items():
+                self._extend_coverage(ticker, np.datetime64(lo, "D"), np.datetime64(hi, "D"), overlap_only=True)
+            text = json.dumps(self.coverage)
+            self._replace(self._coverage_path, lambda f: f.write(text), "w")
+
+    def missing_ranges(self, ticker, start, end):
+        if ticker not in self.coverage:
+            return [(start, end)]
+        lo, hi = (np.datetime64(d, "D") for d in self.coverage[ticker])
+        # Gaps are filled up to the covered block so coverage stays one contiguous range
+        ranges = []
+        if start < lo:
+            ranges.append((start, lo))
+        if end > hi:
+            ranges.append((hi, end))
+        return ranges
+
+    def _extend_coverage(self, ticker, lo, hi, overlap_only=False):
+        # Today's bar may still change, so coverage never extends past it. overlap_only skips a
+        # range that would leave a gap (coverage is one contiguous block).
+        hi = min(hi, np.datetime64("today", "D"))
+        if hi <= lo:
+            return
+        if ticker in self.coverage:
+            old_lo, old_hi = (np.datetime64(d, "D") for d in self.coverage[ticker])
+            if overlap_only and (hi < old_lo or lo > old_hi):
+                return
+            lo, hi = min(lo, old_lo), max(hi, old_hi)
+        self.coverage[ticker] = [str(lo), str(hi)]
+
+    def merge(self, ticker, series):
+        series = series.dropna()
+        new = np.empty(len(series), dtype=RECORD)
+        new["date"] = series.index.values.astype("datetime64[D]")
+        new["close"] = series.values
+        with self._lock, self._file_lock():
+            old = np.array(self.read(ticker))
+            # Freshly fetched rows win over stored ones for the same date
+            records = np.concatenate([new, old])
+            _, first = np.unique(records["date"], return_index=True)
+            self._write(ticker, records[first])
+
+    def update(self, tickers, start, end):
+        # Fetch only the date ranges not yet covered, grouping tickers that miss the same range.
+        # Returns {ticker: reason} for tickers the backend could not deliver; their coverage is not extended.
+        with self._lock:
+            return self._update(tickers, _day(start), _day(end))
+
+    def _update(self, tickers, start, end):
+        groups = {}
+        for ticker in dict.fromkeys(tickers):
+            for lo, hi in self.missing_ranges(ticker, start, end):
+                groups.setdefault((lo, hi), []).append(ticker)
+        failures = {}
+        for (lo, hi), group in groups.items():
+            try:
+                fetched = self.backend(group, lo, hi)
+            except Exception as e:
+                failures.update({ticker: f"{type(e).__name__}: {e}" for ticker in group})
+                continue
+            reasons = fetched.attrs.get("failed", {})
+            for ticker in group:
+                if ticker not in fetched.columns:
+                    failures[ticker] = reasons.get(ticker, "not returned")
+                    continue
+                self.merge(ticker, fetched[ticker])
+                self._extend_coverage(ticker, lo, hi)
+            self._save_coverage()
+        return failures
+
+    def load(self, tickers, start, end):
+        start, end = _day(start), _day(end)
+        columns = {}
+        for ticker in tickers:
+            records = self.read(ticker)
+            lo, hi = np.searchsorted(records["date"], [start, end])
+            part = records[lo:hi]
+            columns[ticker] = pd.Series(np.array(part["close"]), index=pd.DatetimeIndex(np.array(part["date"])))
+        return pd.DataFrame(columns, columns=list(tickers))
+
+    def get(self, tickers, start, end):
+        self.update(tickers, start, end)
+        return self.load(tickers, start, end)
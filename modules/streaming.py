@@ -0,0 +1,135 @@
+# Project by @QuantDevJayson
+# GitHub: https://github.com/QuantDevJayson
+# PyPI: https://pypi.org/user/jayson.ashioya
+# LinkedIn: https://www.linkedin.com/in/jayson-ashioya-c-082814176/
+
+import numpy as np
+import pandas as pd
+
+# Incremental correlation engine: keeps the mean vector and co-moment matrix of log returns
+# and updates them in O(N^2) per bar. Three modes:
+#   expanding (default)  - all bars seen so far
+#   window=W             - the last W bars (ring buffer, exact removal)
+#   halflife=H           - exponentially weighted moments
+
+
+class StreamingCorrelation:
+    def __init__(self, tickers, window=None, halflife=None):
+        if window is not None and halflife is not None:
+            raise ValueError("Use either window or halflife, not both")
+        self.tickers = pd.Index(tickers)
+        self.window = window
+        self.alpha = 1 - 0.5 ** (1 / halflife) if halflife is not None else None
+        n = len(self.tickers)
+        self.count = 0
+        self.mean = np.zeros(n)
+        self.comoment = np.zeros((n, n))
+        self.last_price = None
+        if window is not None:
+            self._buffer = np.empty((window, n))
+            self._head = 0
+            self._since_resync = 0
+
+    @classmethod
+    def from_prices(cls, prices, window=None, halflife=None):
+        engine = cls(prices.columns, window=window, halflife=halflife)
+        engine.extend(np.log(prices / prices.shift(1)).iloc[1:])
+        engine.last_price = prices.iloc[-1].to_numpy(dtype=float)
+        return engine
+
+    def _row(self, values):
+        if isinstance(values, pd.Series):
+            values = values.reindex(self.tickers)
+        return np.asarray(values, dtype=float)
+
+    def _add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.comoment += np.outer(delta, x - self.mean)
+
+    def _remove(self, x):
+        self.count -= 1
+        delta = x - self.mean
+        self.mean -= delta / self.count
+        self.comoment -= np.outer(delta, x - self.mean)
+
+    def _reset(self, block):
+        # Exact moments of a block of rows
+        self.count = len(block)
+        self.mean = block.mean(axis=0)
+        centered = block - self.mean
+        self.comoment = centered.T @ centered
+
+    def update(self, returns_row):
+        x = self._row(returns_row)
+        if np.isnan(x).any():
+            # Bars with missing values are skipped, as dropna does in correlation_matrix
+            return self
+        if self.alpha is not None:
+            if self.count == 0:
+                self.mean = x.copy()
+            else:
+                delta = x - self.mean
+                self.mean += self.alpha * delta
+                self.comoment = (1 - self.alpha) * (self.comoment + self.alpha * np.outer(delta, delta))
+            self.count += 1
+        elif self.window is not None:
+            if self.count == self.window:
+                self._remove(self._buffer[self._head])
+            self._buffer[self._head] = x
+            self._head = (self._head + 1) % self.window
+            self._add(x)
+            # Rebuild from the buffer once per window to stop rounding error from accumulating
+            self._since_resync += 1
+            if self._since_resync >= self.window and self.count == self.window:
+                self._reset(self._buffer)
+                self._since_resync = 0
+        else:
+            self._add(x)
+        return self
+
+    def update_prices(self, price_row):
+        price = self._row(price_row)
+        if self.last_price is not None:
+            self.update(np.log(price / self.last_price))
+        self.last_price = price
+        return self
+
+    def extend(self, returns):
+        block = np.asarray(returns, dtype=float)
+        block = block[~np.isnan(block).any(axis=1)]
+        if self.window is not None and len(block) >= self.window:
+            self._buffer[:] = block[-self.window:]
+            self._head = 0
+            self._since_resync = 0
+            self._reset(self._buffer)
+        elif self.alpha is None and self.window is None and len(block):
+            # Merge block moments with the running ones (Chan et al. parallel update)
+            n_a, mean_a, com_a = self.count, self.mean, self.comoment
+            self._reset(block)
+            n_b, mean_b = self.count, self.mean
+            n = n_a + n_b
+            delta = mean_b - mean_a
+            self.comoment = com_a + self.comoment + np.outer(delta, delta) * (n_a * n_b / n)
+            self.mean = mean_a + delta * (n_b / n)
+            self.count = n
+        else:
+            for x in block:
+                self.update(x)
+        return self
+
+    def covariance(self):
+        if self.alpha is not None:
+            cov = self.comoment
+        else:
+            cov = self.comoment / (self.count - 1) if self.count > 1 else np.full_like(self.comoment, np.nan)
+        return pd.DataFrame(cov, index=self.tickers, columns=self.tickers)
+
+    def correlation(self):
+        cov = self.covariance().to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            std = np.sqrt(np.diag(cov))
+            corr = cov / np.outer(std, std)
+        np.fill_diagonal(corr, np.where(std > 0, 1.0, np.nan))
+        return pd.DataFrame(corr, index=self.tickers, columns=self.tickers)
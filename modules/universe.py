@@ -0,0 +1,170 @@
+# Project by @QuantDevJayson
+# GitHub: https://github.com/QuantDevJayson
+# PyPI: https://pypi.org/user/jayson.ashioya
+# LinkedIn: https://www.linkedin.com/in/jayson-ashioya-c-082814176/
+
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+from modules.data import GLOBAL_INDICES, PRICE_STORE_DIR, default_store
+
+# Universe matrix: every GLOBAL_INDICES ticker in one date x ticker float32 matrix, saved as a
+# column-major .npy file and memory-mapped read-only. Each ticker's history is one contiguous run
+# of the file and columns are grouped by region, so a region (or any run of neighbouring tickers)
+# is a zero-copy view. Processes that map the same file share its pages through the OS page cache.
+#
+#   python -m modules.universe --start 2015-01-01
+#
+# Each build goes into a new version directory; meta.json is replaced last and points at it, so
+# readers never see a half-written matrix.
+
+UNIVERSE_DIR = os.path.join(PRICE_STORE_DIR, "universe")
+KEEP_VERSIONS = 2
+
+
+def _day(value):
+    return np.datetime64(pd.Timestamp(value).date(), "D")
+
+
+def universe_columns(universe=GLOBAL_INDICES):
+    # Tickers in region order, each listed once (under the first region it appears in)
+    tickers, regions = [], {}
+    seen = set()
+    for region, members in universe.items():
+        lo = len(tickers)
+        for ticker in members:
+            if ticker not in seen:
+                seen.add(ticker)
+                tickers.append(ticker)
+        regions[region] = [lo, len(tickers)]
+    return tickers, regions
+
+
+def build_universe(start, end, store=None, universe=GLOBAL_INDICES, root=UNIVERSE_DIR, fetch=True):
+    store = store or default_store()
+    tickers, regions = universe_columns(universe)
+    start, end = _day(start), _day(end)
+    failed = store.update(tickers, start, end) if fetch else {}
+    records = {}
+    for ticker in tickers:
+        rec = store.read(ticker)
+        lo, hi = np.searchsorted(rec["date"], [start, end])
+        records[ticker] = rec[lo:hi]
+    dates = np.unique(np.concatenate([r["date"] for r in records.values()] + [np.empty(0, "datetime64[D]")]))
+    version = time.strftime("%Y%m%d%H%M%S") + f"-{os.getpid()}"
+    directory = os.path.join(root, version)
+    os.makedirs(directory)
+    np.save(os.path.join(directory, "dates.npy"), dates)
+    matrix = np.lib.format.open_memmap(os.path.join(directory, "prices.npy"), mode="w+", dtype=np.float32,
+                                       shape=(len(dates), len(tickers)), fortran_order=True)
+    matrix[:] = np.nan
+    for j, ticker in enumerate(tickers):
+        rec = records[ticker]
+        matrix[np.searchsorted(dates, rec["date"]), j] = rec["close"]
+    matrix.flush()
+    del matrix
+    meta = {"version": version, "tickers": tickers, "regions": regions, "start": str(start), "end": str(end)}
+    tmp = os.path.join(root, "meta.json.tmp")
+    with open(tmp, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp, os.path.join(root, "meta.json"))
+    # Older versions can go: processes still mapping them keep their pages until they unmap
+    versions = sorted(d for d in os.listdir(root) if os.path.isdir(os.path.join(root, d)))
+    for old in versions[:-KEEP_VERSIONS]:
+        shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+    return failed
+
+
+def meta_stamp(root=UNIVERSE_DIR):
+    # Changes whenever a build replaces meta.json; None while no universe has been built
+    try:
+        stat = os.stat(os.path.join(root, "meta.json"))
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_ino
+
+
+class UniverseMatrix:
+    def __init__(self, root=UNIVERSE_DIR):
+        with open(os.path.join(root, "meta.json")) as f:
+            meta = json.load(f)
+        directory = os.path.join(root, meta["version"])
+        self.version = meta["version"]
+        self.start, self.end = _day(meta["start"]), _day(meta["end"])
+        self.tickers = pd.Index(meta["tickers"])
+        self.regions = {name: slice(lo, hi) for name, (lo, hi) in meta["regions"].items()}
+        self._dates = np.load(os.path.join(directory, "dates.npy"))
+        self.dates = pd.DatetimeIndex(self._dates)
+        self.values = np.load(os.path.join(directory, "prices.npy"), mmap_mode="r")
+        self._columns = {t: j for j, t in enumerate(self.tickers)}
+
+    @classmethod
+    def open(cls, root=UNIVERSE_DIR):
+        if not os.path.exists(os.path.join(root, "meta.json")):
+            return None
+        return cls(root)
+
+    def covers(self, tickers, start, end):
+        # Coverage ends at the build's end date; later requests go through the price store
+        return self.start <= _day(start) and _day(end) <= self.end and all(t in self._columns for t in tickers)
+
+    def _rows(self, start, end):
+        lo = 0 if start is None else np.searchsorted(self._dates, _day(start))
+        hi = len(self._dates) if end is None else np.searchsorted(self._dates, _day(end))
+        return slice(lo, hi)
+
+    def _cols(self, tickers):
+        # A run of consecutive columns becomes a slice (a view); anything else is gathered
+        idx = np.fromiter((self._columns[t] for t in tickers), dtype=np.intp, count=len(tickers))
+        if len(idx) and np.array_equal(idx, np.arange(idx[0], idx[0] + len(idx))):
+            return slice(idx[0], idx[0] + len(idx))
+        return idx
+
+    def select(self, tickers, start=None, end=None):
+        tickers = list(dict.fromkeys(tickers))
+        rows, cols = self._rows(start, end), self._cols(tickers)
+        return self.values[rows, cols], self.dates[rows], pd.Index(tickers)
+
+    def region(self, name, start=None, end=None):
+        rows, cols = self._rows(start, end), self.regions[name]
+        return self.values[rows, cols], self.dates[rows], self.tickers[cols]
+
+    def frame(self, tickers, start=None, end=None):
+        values, dates, columns = self.select(tickers, start, end)
+        return pd.DataFrame(values, index=dates, columns=columns, copy=False)
+
+    def load(self, tickers, start, end, min_obs=20):
+        # Same contract as data.load_prices: prices without all-missing dates plus a per-ticker status
+        values, dates, columns = self.select(tickers, start, end)
+        counts = (~np.isnan(values)).sum(axis=0)
+        report = pd.Series("ok", index=columns, dtype=object)
+        report[counts < min_obs] = "short"
+        report[counts == 0] = "empty"
+        keep = (report == "ok").to_numpy()
+        if not keep.all():
+            values, columns = values[:, keep], columns[keep]
+        present = ~np.isnan(values).all(axis=1)
+        if not present.all():
+            values, dates = values[present], dates[present]
+        return pd.DataFrame(values, index=dates, columns=columns, copy=False), report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the memory-mapped universe price matrix from the price store")
+    parser.add_argument("--start", default="2015-01-01")
+    parser.add_argument("--end", default=str(pd.Timestamp.today().date()))
+    parser.add_argument("--no-fetch", action="store_true", help="Only use prices already in the store")
+    args = parser.parse_args(argv)
+    failed = build_universe(args.start, args.end, fetch=not args.no_fetch)
+    universe = UniverseMatrix.open()
+    print(f"{len(universe.tickers)} tickers x {len(universe.dates)} dates, {len(failed)} not fetched -> {UNIVERSE_DIR}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -8,46 +8,160 @@ import plotly.graph_objects as go
 import plotly.express as px
 import networkx as nx
 import pandas as pd
-from scipy.cluster.hierarchy import dendrogram
+from scipy.cluster.hierarchy import dendrogram, leaves_list
 import numpy as np
+from collections import OrderedDict
+from modules.centrality import graph_fingerprint
+from modules.instrumentation import instrument
+from modules.network import cluster_linkage, correlation_distance
 
-def plot_correlation_matrix(corr):
-    fig = px.imshow(corr, text_auto=True, aspect="auto", color_continuous_scale="RdBu")
-    fig.update_layout(title="Correlation Matrix", margin=dict(l=0, r=0, t=40, b=0))
+# Large universes: the heatmap is shown in clustering order, block-averaged down to at most
+# HEATMAP_MAX_CELLS per side, and cell annotations are only written for small matrices
+HEATMAP_MAX_CELLS = 150
+ANNOTATE_LIMIT = 20
+DENDROGRAM_LABEL_LIMIT = 100
+
+@instrument
+def cluster_order(corr):
+    if len(corr) < 3:
+        return np.arange(len(corr))
+    return leaves_list(cluster_linkage(correlation_distance(corr), method="average"))
+
+def block_average(values, block):
+    n = len(values)
+    m = -(-n // block)
+    padded = np.full((m * block, m * block), np.nan)
+    padded[:n, :n] = values
+    return np.nanmean(padded.reshape(m, block, m, block), axis=(1, 3))
+
+@instrument
+def plot_correlation_matrix(corr, order=None, title="Correlation Matrix"):
+    corr = pd.DataFrame(corr)
+    order = cluster_order(corr) if order is None else np.asarray(order)
+    labels = np.asarray(corr.columns[order], dtype=str)
+    values = corr.to_numpy(dtype=float)[np.ix_(order, order)]
+    block = -(-len(values) // HEATMAP_MAX_CELLS)
+    if block > 1:
+        values = block_average(values, block)
+        starts = labels[::block]
+        ends = labels[np.minimum(np.arange(block - 1, len(labels) + block - 1, block), len(labels) - 1)]
+        labels = [f"{a}..{b}" for a, b in zip(starts, ends)]
+    frame = pd.DataFrame(values, index=labels, columns=labels)
+    fig = px.imshow(frame, text_auto=len(frame) <= ANNOTATE_LIMIT, aspect="auto", color_continuous_scale="RdBu",
+                    zmin=-1, zmax=1)
+    title = title if block == 1 else f"{title} (mean of {block}x{block} blocks)"
+    fig.update_layout(title=title, margin=dict(l=0, r=0, t=40, b=0))
     return fig
 
-def plot_network(G):
-    pos = nx.spring_layout(G)
-    edge_x = []
-    edge_y = []
-    for edge in G.edges():
-        x0, y0 = pos[edge[0]]
-        x1, y1 = pos[edge[1]]
-        edge_x += [x0, x1, None]
-        edge_y += [y0, y1, None]
-    node_x = [pos[node][0] for node in G.nodes()]
-    node_y = [pos[node][1] for node in G.nodes()]
+# Layouts are cached per graph fingerprint. A graph that shares most of its edges with the last
+# one drawn of the same kind (e.g. the threshold network after a date change) starts from that
+# layout's positions so nodes keep their place between reruns; anything else gets a full layout.
+LAYOUT_CACHE_SIZE = 16
+LAYOUT_KINDS = 8
+WARM_ITERATIONS = 5
+WARM_START_OVERLAP = 0.5
+LARGE_GRAPH = 100
+EDGES_PER_NODE = 4
+_layouts = OrderedDict()
+_last_layout = OrderedDict()
+
+def _edge_set(G):
+    return {(u, v) if str(u) <= str(v) else (v, u) for u, v in G.edges()}
+
+@instrument
+def network_layout(G, seed=42, iterations=50, kind="network"):
+    key = (graph_fingerprint(G), seed)
+    if key in _layouts:
+        _layouts.move_to_end(key)
+        return _layouts[key]
+    edges = _edge_set(G)
+    last_edges, last_pos = _last_layout.get(kind, (set(), {}))
+    overlap = len(edges & last_edges) / max(len(edges | last_edges), 1)
+    # spring_layout returns positions in [-1, 1] but runs its dynamics on the unit square
+    init = {node: (last_pos[node] + 1) / 2 for node in G.nodes() if node in last_pos}
+    if init and overlap >= WARM_START_OVERLAP:
+        pos = nx.spring_layout(G, pos=init, seed=seed, iterations=WARM_ITERATIONS)
+    else:
+        pos = nx.spring_layout(G, seed=seed, iterations=iterations)
+    _last_layout[kind] = (edges, pos)
+    _last_layout.move_to_end(kind)
+    while len(_last_layout) > LAYOUT_KINDS:
+        _last_layout.popitem(last=False)
+    _layouts[key] = pos
+    while len(_layouts) > LAYOUT_CACHE_SIZE:
+        _layouts.popitem(last=False)
+    return pos
+
+def strongest_edges(G, max_edges):
+    # Keep the max_edges edges with the largest |weight|
+    edges = list(G.edges(data="weight", default=1.0))
+    if len(edges) <= max_edges:
+        return G
+    strength = np.abs(np.fromiter((w for _, _, w in edges), dtype=float, count=len(edges)))
+    keep = np.argpartition(-strength, max_edges - 1)[:max_edges]
+    H = nx.Graph()
+    H.add_nodes_from(G.nodes())
+    H.add_weighted_edges_from(edges[i] for i in keep)
+    return H
+
+@instrument
+def plot_network(G, seed=42, kind="network"):
+    # kind separates graph families (threshold network, MST) for the layout warm start
+    n = G.number_of_nodes()
+    if n > LARGE_GRAPH:
+        # Dense graphs are unreadable and slow to draw; show only the strongest links
+        G = strongest_edges(G, EDGES_PER_NODE * n)
+    pos = network_layout(G, seed=seed, kind=kind)
+    nodes = list(G.nodes())
+    index = {node: i for i, node in enumerate(nodes)}
+    xy = np.array([pos[node] for node in nodes], dtype=float).reshape(-1, 2)
+    ends = np.array([(index[u], index[v]) for u, v in G.edges()], dtype=int).reshape(-1, 2)
+    # One polyline for all edges: x0, x1, NaN per edge
+    gap = np.full(len(ends), np.nan)
+    edge_x = np.column_stack([xy[ends[:, 0], 0], xy[ends[:, 1], 0], gap]).ravel()
+    edge_y = np.column_stack([xy[ends[:, 0], 1], xy[ends[:, 1], 1], gap]).ravel()
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=edge_x, y=edge_y, line=dict(width=1, color="#888"), hoverinfo="none", mode="lines"))
-    fig.add_trace(go.Scatter(x=node_x, y=node_y, mode="markers+text", marker=dict(size=20, color="#1f77b4"), text=list(G.nodes()), textposition="bottom center"))
+    fig.add_trace(go.Scattergl(x=edge_x, y=edge_y, line=dict(width=1, color="#888"), hoverinfo="none", mode="lines"))
+    labels = [str(node) for node in nodes]
+    # Text labels only while they stay legible; large graphs show them on hover
+    mode = "markers+text" if n <= 100 else "markers"
+    size = 20 if n <= 100 else 8
+    fig.add_trace(go.Scattergl(x=xy[:, 0], y=xy[:, 1], mode=mode, marker=dict(size=size, color="#1f77b4"), text=labels,
+                               hoverinfo="text", textposition="bottom center"))
     fig.update_layout(title="Network Graph", showlegend=False, margin=dict(l=0, r=0, t=40, b=0))
     return fig
 
+@instrument
 def plot_dendrogram(Z, labels):
-    import scipy.cluster.hierarchy as sch
     import plotly.colors as pc
-    fig = go.Figure()
     dendro = dendrogram(Z, labels=labels, orientation='top', no_plot=True)
-    icoord = np.array(dendro['icoord'])
-    dcoord = np.array(dendro['dcoord'])
-    color_list = dendro.get('color_list', ['black'] * len(icoord))
-    asset_labels = dendro.get('ivl', labels)
+    icoord = np.asarray(dendro['icoord'], dtype=float)
+    dcoord = np.asarray(dendro['dcoord'], dtype=float)
+    color_list = np.asarray(dendro.get('color_list', ['C0'] * len(icoord)))
     palette = pc.qualitative.Plotly
-    for i, (xs, ys) in enumerate(zip(icoord, dcoord)):
-        color = palette[i % len(palette)] if i < len(palette) else 'black'
-        fig.add_trace(go.Scatter(x=xs, y=ys, mode='lines', line=dict(color=color, width=3)))
-    leaf_positions = [xs[1] for xs in icoord[:len(asset_labels)]]
-    for x, label in zip(leaf_positions, asset_labels):
-        fig.add_trace(go.Scatter(x=[x], y=[0], mode='text', text=[label], textposition='bottom center', showlegend=False))
-    fig.update_layout(title="Hierarchical Clustering Dendrogram", xaxis=dict(showticklabels=False), yaxis=dict(showticklabels=True))
+    fig = go.Figure()
+    # One NaN-separated polyline per cluster colour instead of one trace per merge
+    for i, color in enumerate(dict.fromkeys(color_list)):
+        links = color_list == color
+        gap = np.full((links.sum(), 1), np.nan)
+        xs = np.hstack([icoord[links], gap]).ravel()
+        ys = np.hstack([dcoord[links], gap]).ravel()
+        fig.add_trace(go.Scattergl(x=xs, y=ys, mode='lines', line=dict(color=palette[i % len(palette)], width=3),
+                                   hoverinfo='none', showlegend=False))
+    # Leaves sit at x = 5, 15, 25, ... in scipy's dendrogram coordinates
+    asset_labels = dendro['ivl']
+    if len(asset_labels) <= DENDROGRAM_LABEL_LIMIT:
+        xaxis = dict(tickmode='array', tickvals=(10 * np.arange(len(asset_labels)) + 5).tolist(), ticktext=asset_labels)
+    else:
+        xaxis = dict(showticklabels=False)
+    fig.update_layout(title="Hierarchical Clustering Dendrogram", xaxis=xaxis, yaxis=dict(showticklabels=True))
+    return fig
+
+def plot_efficient_frontier(frontier):
+    # frontier: summary frame from portfolio.efficient_frontier
+    fig = go.Figure(go.Scatter(x=frontier["volatility"], y=frontier["return"], mode='lines+markers',
+                               customdata=frontier["risk_aversion"],
+                               hovertemplate="Volatility %{x:.2%}<br>Return %{y:.2%}<br>Risk aversion %{customdata:.3g}<extra></extra>"))
+    fig.update_layout(title="Efficient Frontier", xaxis=dict(title="Annualized Volatility", tickformat=".0%"),
+                      yaxis=dict(title="Annualized Return", tickformat=".0%"))
     return fig
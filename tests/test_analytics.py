@@ -0,0 +1,98 @@
+# Project by @QuantDevJayson
+# GitHub: https://github.com/QuantDevJayson
+# PyPI: https://pypi.org/user/jayson.ashioya
+# LinkedIn: https://www.linkedin.com/in/jayson-ashioya-c-082814176/
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+from modules.analytics import METRIC_COLUMNS, performance_metrics, performance_table
+
+
+def _reference(returns, benchmark=None):
+    # The original single-series formulas: pandas reductions and a LinearRegression fit
+    mean_return = returns.mean()
+    volatility = returns.std()
+    downside = returns[returns < 0].std()
+    cum_returns = returns.cumsum()
+    max_drawdown = (cum_returns - cum_returns.cummax()).min()
+    alpha, beta, info_ratio = np.nan, np.nan, np.nan
+    if benchmark is not None and len(benchmark) == len(returns):
+        # LinearRegression rejects NaNs, so the fit uses the bars where both are observed
+        both = returns.notna() & benchmark.notna()
+        reg = LinearRegression().fit(benchmark[both].values.reshape(-1, 1), returns[both].values)
+        beta, alpha = reg.coef_[0], reg.intercept_
+        tracking = (returns - benchmark).std()
+        info_ratio = (returns.mean() - benchmark.mean()) / tracking if tracking != 0 else np.nan
+    return {
+        "Mean Return": mean_return,
+        "Volatility": volatility,
+        "Sharpe": mean_return / volatility if volatility != 0 else np.nan,
+        "Sortino": mean_return / downside if downside != 0 else np.nan,
+        "Max Drawdown": max_drawdown,
+        "Calmar Ratio": mean_return / abs(max_drawdown) if max_drawdown != 0 else np.nan,
+        "Alpha": alpha,
+        "Beta": beta,
+        "Information Ratio": info_ratio,
+        "Downside Deviation": np.sqrt(np.mean(np.minimum(returns, 0) ** 2)),
+    }
+
+
+def _returns(T=400, K=6, missing=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2021-01-01", periods=T)
+    benchmark = pd.Series(rng.normal(0.0003, 0.01, T), index=index)
+    R = 0.8 * benchmark.to_numpy()[:, None] + rng.normal(0.0002, 0.008, (T, K))
+    R[rng.random((T, K)) < missing] = np.nan
+    # Leading gap, as in walk-forward returns of an asset listed late
+    R[:25, 0] = np.nan
+    return pd.DataFrame(R, index=index, columns=[f"p{k}" for k in range(K)]), benchmark
+
+
+def _assert_close(actual, expected):
+    for column in METRIC_COLUMNS:
+        assert actual[column] == pytest.approx(expected[column], rel=1e-9, abs=1e-12, nan_ok=True), column
+
+
+@pytest.mark.parametrize("missing", [0.0, 0.1])
+@pytest.mark.parametrize("with_benchmark", [False, True])
+def test_table_matches_single_series_formulas(missing, with_benchmark):
+    returns, benchmark = _returns(missing=missing)
+    if with_benchmark and missing:
+        benchmark = benchmark.copy()
+        benchmark.iloc[::17] = np.nan
+    table = performance_table(returns, benchmark if with_benchmark else None)
+    assert list(table.columns) == METRIC_COLUMNS
+    assert list(table.index) == list(returns.columns)
+    for column in returns.columns:
+        _assert_close(table.loc[column], _reference(returns[column], benchmark if with_benchmark else None))
+
+
+def test_degenerate_columns():
+    # Constant, all-positive, all-missing and single-observation portfolios
+    index = pd.bdate_range("2022-01-03", periods=50)
+    returns = pd.DataFrame({"flat": 0.0, "up": np.linspace(0.001, 0.002, 50), "empty": np.nan, "one": np.nan},
+                           index=index)
+    returns.iloc[10, 3] = 0.01
+    table = performance_table(returns)
+    for column in returns.columns:
+        _assert_close(table.loc[column], _reference(returns[column]))
+
+
+def test_benchmark_of_other_length_is_ignored():
+    returns, benchmark = _returns()
+    table = performance_table(returns, benchmark.iloc[1:])
+    assert table[["Alpha", "Beta", "Information Ratio"]].isna().all().all()
+
+
+def test_metrics_match_original_formulas():
+    returns, benchmark = _returns(missing=0.05)
+    series = returns["p1"]
+    weights = np.array([0.5, 0.3, 0.2])
+    metrics = performance_metrics(series, benchmark=benchmark, weights=weights)
+    _assert_close(metrics, _reference(series, benchmark))
+    assert metrics["Turnover"] == pytest.approx(np.sum(np.abs(np.diff(weights))) / len(weights))
+    assert metrics["Centrality Scores"] == {}
+    assert np.isnan(performance_metrics(series)["Turnover"])
+    assert performance_metrics(series, weights=weights, turnover=0.25)["Turnover"] == 0.25
@@ -0,0 +1,30 @@
+# Project by @QuantDevJayson
+# GitHub: https://github.com/QuantDevJayson
+# PyPI: https://pypi.org/user/jayson.ashioya
+# LinkedIn: https://www.linkedin.com/in/jayson-ashioya-c-082814176/
+
+import numpy as np
+import pandas as pd
+import pytest
+from modules.backtest import STRATEGIES, walk_forward
+from modules.panel import ReturnsPanel
+
+
+def _returns(n_days=420, n_assets=24, seed=0):
+    # Two sectors whose correlations drift, so communities change between windows
+    rng = np.random.default_rng(seed)
+    drift = np.linspace(0.2, 1.2, n_days)[:, None]
+    sectors = rng.normal(0, 0.01, (n_days, 2)) * drift
+    loadings = np.repeat(np.eye(2), n_assets // 2, axis=0).T
+    values = sectors @ loadings + rng.normal(0, 0.01, (n_days, n_assets))
+    dates = pd.bdate_range("2021-01-01", periods=n_days)
+    return ReturnsPanel(pd.DataFrame(values, index=dates, columns=[f"A{i:02d}" for i in range(n_assets)]))
+
+
+@pytest.mark.parametrize("name", ["Cluster-Based", "Centrality-Based", "MST", "Mean-Variance", "HRP"])
+def test_walk_forward_weights_do_not_depend_on_worker_count(name):
+    panel = _returns()
+    runs = [walk_forward(panel, strategy=STRATEGIES[name], lookback=126, frequency=21, max_workers=w)["weights"]
+            for w in (1, 3, 1)]
+    for weights in runs[1:]:
+        np.testing.assert_allclose(weights.to_numpy(), runs[0].to_numpy(), atol=1e-12)
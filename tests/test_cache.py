@@ -0,0 +1,26 @@
+# Project by @QuantDevJayson
+# GitHub: https://github.com/QuantDevJayson
+# PyPI: https://pypi.org/user/jayson.ashioya
+# LinkedIn: https://www.linkedin.com/in/jayson-ashioya-c-082814176/
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from modules.cache import StageCache, nbytes
+
+
+def _block(seed):
+    return np.full(1000, float(seed))
+
+
+def test_shared_cache_bookkeeping_under_threads():
+    # Sessions hitting and evicting one cache concurrently keep its size accounting exact
+    cache = StageCache(max_bytes=20 * 8000)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda i: cache.run("block", _block, i % 40), range(4000)))
+    assert all(r[0] == i % 40 for i, r in enumerate(results))
+    assert cache.hits + cache.misses == 4000
+    assert cache.size == sum(size for _, size in cache._entries.values())
+    assert cache.size <= cache.max_bytes
+    assert set(id(v) for v, _ in cache._entries.values()) == set(cache._keys)
+    assert all(size == nbytes(v) for v, size in cache._entries.values())
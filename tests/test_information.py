@@ -0,0 +1,24 @@
+# Project by @QuantDevJayson
+# GitHub: https://github.com/QuantDevJayson
+# PyPI: https://pypi.org/user/jayson.ashioya
+# LinkedIn: https://www.linkedin.com/in/jayson-ashioya-c-082814176/
+
+import numpy as np
+import pandas as pd
+from modules import information
+from modules.information import mutual_information_matrix
+from modules.panel import ReturnsPanel
+
+
+def test_cache_tells_equal_shaped_panels_apart():
+    # Same tickers, shape and integer row index; only the data differs
+    information._cache.clear()
+    rng = np.random.default_rng(0)
+    a = rng.normal(size=(300, 2))
+    b = a.copy()
+    b[:, 1] = a[:, 0] + 0.05 * rng.normal(size=300)
+    for values in (a, b, a.astype(np.float32)):
+        panel = ReturnsPanel(pd.DataFrame(values, columns=["a", "b"]))
+        cached = mutual_information_matrix(panel, max_workers=1)
+        fresh = mutual_information_matrix(panel, max_workers=1, cache=False)
+        pd.testing.assert_frame_equal(cached, fresh)
@@ -0,0 +1,133 @@
+# Project by @QuantDevJayson
+# GitHub: https://github.com/QuantDevJayson
+# PyPI: https://pypi.org/user/jayson.ashioya
+# LinkedIn: https://www.linkedin.com/in/jayson-ashioya-c-082814176/
+
+import time
+import tracemalloc
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+from modules import network
+from modules.backtest import walk_forward
+from modules.network import hierarchical_clustering, mst_network, network_edges
+from modules.panel import ReturnsPanel
+from modules.portfolio import hrp_weights
+
+
+def _returns(n_days, n_assets, seed):
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0, 0.01, (n_days, 1))
+    values = market * rng.uniform(0.5, 1.5, n_assets) + rng.normal(0, 0.01, (n_days, n_assets))
+    dates = pd.bdate_range("2020-01-01", periods=n_days)
+    return pd.DataFrame(values, index=dates, columns=[f"A{i:02d}" for i in range(n_assets)])
+
+
+def test_linkage_cache_tells_equal_shaped_windows_apart():
+    # Same tickers and length, no date index (as walk_forward passes them), different data
+    network._linkages.clear()
+    first = _returns(120, 12, seed=1).reset_index(drop=True)
+    second = _returns(120, 12, seed=2).reset_index(drop=True)
+    for window in (first, second):
+        panel = ReturnsPanel(window)
+        cached = hierarchical_clustering(panel)
+        np.testing.assert_array_equal(cached, hierarchical_clustering(panel, cache=False))
+
+
+def test_walk_forward_hrp_matches_uncached_weights():
+    network._linkages.clear()
+    returns = _returns(400, 30, seed=3)
+    lookback = 126
+    result = walk_forward(ReturnsPanel(returns), lookback=lookback, frequency=21, max_workers=1)
+    for date, weights in result["weights"].iterrows():
+        stop = returns.index.get_loc(date)
+        window = ReturnsPanel(returns.iloc[stop - lookback:stop].reset_index(drop=True))
+        Z = hierarchical_clustering(window, cache=False)
+        expected, _ = hrp_weights(window, Z=Z)
+        np.testing.assert_allclose(weights.to_numpy(), expected.to_numpy(), atol=1e-12)
+
+
+def _reference_mst(corr):
+    # mst_network as it was before mst_edges: a complete graph handed to networkx
+    dist = 1 - np.abs(corr)
+    G = nx.Graph()
+    for i in corr.columns:
+        for j in corr.columns:
+            if i != j:
+                G.add_edge(i, j, weight=dist.loc[i, j])
+    return nx.minimum_spanning_tree(G)
+
+
+def _edges(G):
+    return {frozenset((u, v)): d["weight"] for u, v, d in G.edges(data=True)}
+
+
+@pytest.mark.parametrize("n_assets", [1, 2, 3, 10, 40])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_mst_matches_complete_graph_tree(n_assets, seed):
+    corr = _returns(250, n_assets, seed).corr()
+    tree, expected = mst_network(corr), _reference_mst(corr)
+    assert sorted(map(str, tree.nodes())) == sorted(map(str, expected.nodes()))
+    edges, reference = _edges(tree), _edges(expected)
+    assert edges.keys() == reference.keys()
+    for edge, weight in reference.items():
+        assert edges[edge] == pytest.approx(weight, abs=1e-12)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_mst_with_tied_distances(seed):
+    # Rounded correlations tie often, so several trees are minimal: compare what every minimum
+    # spanning tree shares, its sorted edge weights, and check it spans all assets
+    corr = _returns(250, 25, seed).corr().round(1)
+    tree, expected = mst_network(corr), _reference_mst(corr)
+    assert nx.is_tree(tree) and tree.number_of_nodes() == len(corr)
+    weights = sorted(d["weight"] for _, _, d in tree.edges(data=True))
+    reference = sorted(d["weight"] for _, _, d in expected.edges(data=True))
+    np.testing.assert_allclose(weights, reference, atol=1e-12)
+
+
+def test_mst_of_perfectly_correlated_assets():
+    # Zero distances are real edges, not missing ones
+    corr = pd.DataFrame(np.ones((4, 4)), index=list("ABCD"), columns=list("ABCD"))
+    tree = mst_network(corr)
+    assert nx.is_tree(tree) and tree.number_of_nodes() == 4
+    assert all(d["weight"] == 0 for _, _, d in tree.edges(data=True))
+
+
+@pytest.mark.parametrize("top_k", [None, 0, 1, 3])
+def test_network_edges_match_per_node_definition(top_k):
+    # An edge |rho| > threshold survives top_k when it is among the top_k strongest of either end
+    corr = _returns(250, 15, seed=4).corr().to_numpy()
+    threshold = 0.3
+    strength = np.where(np.abs(corr) > threshold, np.abs(corr), -np.inf)
+    np.fill_diagonal(strength, -np.inf)
+    expected = set()
+    for i in range(len(corr)):
+        candidates = np.flatnonzero(np.isfinite(strength[i]))
+        best = candidates[np.argsort(-strength[i, candidates])][:top_k] if top_k is not None else candidates
+        expected |= {(min(i, j), max(i, j)) for j in best}
+    rows, cols, weights = network_edges(corr, threshold, top_k)
+    assert set(zip(rows.tolist(), cols.tolist())) == expected
+    np.testing.assert_array_equal(weights, corr[rows, cols])
+
+
+def test_top_k_on_dense_candidates_stays_row_blocked():
+    # With threshold 0 every pair is a candidate; selection must work a block of rows at a time
+    # instead of materializing all N^2 candidate edges
+    rng = np.random.default_rng(5)
+    n, top_k = 2000, 5
+    A = rng.uniform(-1, 1, (n, n))
+    corr = (A + A.T) / 2
+    np.fill_diagonal(corr, 1.0)
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows, cols, _ = network_edges(corr, 0.0, top_k)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert len(rows) <= n * top_k and (rows < cols).all()
+    # The candidate edge list alone would be 2 x 8 x N^2 bytes
+    assert peak < corr.nbytes
+    assert seconds < 2.0
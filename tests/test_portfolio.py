@@ -0,0 +1,69 @@
+# Project by @QuantDevJayson
+# GitHub: https://github.com/QuantDevJayson
+# PyPI: https://pypi.org/user/jayson.ashioya
+# LinkedIn: https://www.linkedin.com/in/jayson-ashioya-c-082814176/
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.cluster.hierarchy import leaves_list, linkage
+from modules.network import correlation_distance
+from modules.portfolio import hrp_allocation, hrp_weights
+
+
+def _reference_hrp(cov, Z):
+    # Lopez de Prado's getRecBipart: inverse-variance split of each ordered half, list by list
+    order = list(leaves_list(Z))
+    weights = pd.Series(1.0, index=order)
+    clusters = [order]
+    while clusters:
+        clusters = [c[j:k] for c in clusters for j, k in ((0, len(c) // 2), (len(c) // 2, len(c))) if len(c) > 1]
+        for i in range(0, len(clusters), 2):
+            variances = []
+            for items in clusters[i], clusters[i + 1]:
+                sub = cov[np.ix_(items, items)]
+                ivp = 1 / np.diag(sub)
+                ivp /= ivp.sum()
+                variances.append(ivp @ sub @ ivp)
+            alpha = 1 - variances[0] / (variances[0] + variances[1])
+            weights[clusters[i]] *= alpha
+            weights[clusters[i + 1]] *= 1 - alpha
+    return weights.sort_index().to_numpy()
+
+
+def _covariance(n, seed):
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(size=(500, 3))
+    X = factors @ rng.normal(size=(3, n)) + rng.normal(size=(500, n)) * rng.uniform(0.5, 2.0, n)
+    return np.cov(X, rowvar=False)
+
+
+@pytest.mark.parametrize("n", [2, 3, 7, 64, 101])
+@pytest.mark.parametrize("method", ["single", "ward"])
+def test_allocation_matches_recursive_bisection(n, method):
+    cov = _covariance(n, seed=n)
+    std = np.sqrt(np.diag(cov))
+    Z = linkage(correlation_distance(cov / np.outer(std, std)), method=method)
+    weights = hrp_allocation(cov, Z)
+    np.testing.assert_allclose(weights, _reference_hrp(cov, Z), rtol=1e-10)
+    assert weights.sum() == pytest.approx(1.0)
+    assert (weights > 0).all()
+
+
+def test_uncorrelated_assets_get_inverse_variance_weights():
+    # With a diagonal covariance every split is inverse-variance, so HRP is inverse-variance overall
+    variances = np.array([0.01, 0.04, 0.02, 0.09, 0.05])
+    Z = linkage(correlation_distance(np.eye(5)), method="single")
+    expected = (1 / variances) / (1 / variances).sum()
+    np.testing.assert_allclose(hrp_allocation(np.diag(variances), Z), expected, rtol=1e-12)
+
+
+def test_weights_are_labelled_by_ticker():
+    rng = np.random.default_rng(3)
+    index = pd.bdate_range("2020-01-01", periods=300)
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, (300, 6)), axis=0)), index=index,
+                          columns=list("FEDCBA"))
+    weights, clusters = hrp_weights(prices)
+    assert list(weights.index) == list("FEDCBA")
+    assert set(clusters) == set("FEDCBA")
+    assert weights.sum() == pytest.approx(1.0)
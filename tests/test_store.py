@@ -0,0 +1,28 @@
+# Project by @QuantDevJayson
+# GitHub: https://github.com/QuantDevJayson
+# PyPI: https://pypi.org/user/jayson.ashioya
+# LinkedIn: https://www.linkedin.com/in/jayson-ashioya-c-082814176/
+
+import multiprocessing
+
+import pandas as pd
+from modules.store import PriceStore
+
+
+def _merge_days(root, offset, days):
+    # One process adding its own days, one merge per day
+    store = PriceStore(root, backend=None)
+    for day in range(offset, offset + days):
+        store.merge("AAA", pd.Series([float(day)], index=[pd.Timestamp("2020-01-01") + pd.Timedelta(days=day)]))
+
+
+def test_concurrent_processes_keep_every_row(tmp_path):
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=_merge_days, args=(str(tmp_path), 1000 * i, 150)) for i in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+    records = PriceStore(str(tmp_path), backend=None).read("AAA")
+    assert len(records) == 450
@@ -0,0 +1,61 @@
+# Project by @QuantDevJayson
+# GitHub: https://github.com/QuantDevJayson
+# PyPI: https://pypi.org/user/jayson.ashioya
+# LinkedIn: https://www.linkedin.com/in/jayson-ashioya-c-082814176/
+
+import numpy as np
+import pandas as pd
+import pytest
+from modules.streaming import StreamingCorrelation
+
+
+def _prices(T=600, n=8, seed=0):
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0, 0.01, (T, 1))
+    log_returns = 0.6 * market + rng.normal(0, 0.01, (T, n))
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(log_returns, axis=0)), index=pd.bdate_range("2020-01-01", periods=T),
+                          columns=[f"a{i}" for i in range(n)])
+    prices.iloc[[40, 41, 300], 2] = np.nan
+    return prices
+
+
+def _log_returns(prices):
+    return np.log(prices / prices.shift(1)).iloc[1:]
+
+
+def _stream(prices, split, **options):
+    # Seed on the first bars, then feed the rest one price bar at a time
+    engine = StreamingCorrelation.from_prices(prices.iloc[:split], **options)
+    for _, row in prices.iloc[split:].iterrows():
+        engine.update_prices(row)
+    return engine
+
+
+@pytest.mark.parametrize("split", [2, 250])
+def test_expanding_matches_pandas(split):
+    prices = _prices()
+    expected = _log_returns(prices).dropna().corr()
+    pd.testing.assert_frame_equal(_stream(prices, split).correlation(), expected, rtol=1e-10)
+
+
+@pytest.mark.parametrize("window", [20, 120])
+def test_rolling_window_matches_pandas(window):
+    # Long enough for several ring-buffer wraps and resyncs
+    prices = _prices()
+    expected = _log_returns(prices).dropna().iloc[-window:]
+    engine = _stream(prices, 150, window=window)
+    assert engine.count == window
+    pd.testing.assert_frame_equal(engine.covariance(), expected.cov(), rtol=1e-9)
+    pd.testing.assert_frame_equal(engine.correlation(), expected.corr(), rtol=1e-9)
+
+
+def test_halflife_matches_pandas_ewm():
+    prices = _prices()
+    returns = _log_returns(prices).dropna()
+    expected = returns.ewm(halflife=30, adjust=False).corr().loc[returns.index[-1]]
+    pd.testing.assert_frame_equal(_stream(prices, 100, halflife=30).correlation(), expected, rtol=1e-9)
+
+
+def test_rejects_window_with_halflife():
+    with pytest.raises(ValueError):
+        StreamingCorrelation(["a", "b"], window=10, halflife=5)